@@ -37,6 +37,20 @@ class AppConfig:
         self.config['max_retries'] = int(os.environ.get('MAX_RETRIES', Constants.DEFAULT_MAX_RETRIES))
         self.config['requests_per_minute'] = int(os.environ.get('REQUESTS_PER_MINUTE', Constants.DEFAULT_REQUESTS_PER_MINUTE))
         self.config['base_delay'] = float(os.environ.get('BASE_DELAY', Constants.DEFAULT_BASE_DELAY))
+        self.config['pack_chars'] = int(os.environ.get('PACK_CHARS', Constants.DEFAULT_PACK_CHARS))
+        self.config['translate_concurrency'] = int(os.environ.get('TRANSLATE_CONCURRENCY', Constants.DEFAULT_TRANSLATE_CONCURRENCY))
+        
+        # Rendering settings
+        self.config['parallel_render_min_pages'] = int(os.environ.get('PARALLEL_RENDER_MIN_PAGES', Constants.PARALLEL_RENDER_MIN_PAGES))
+        
+        # Cache settings
+        self.config['use_cache'] = os.environ.get('USE_TRANSLATION_CACHE', '1').lower() not in ('0', 'false', 'no')
+        self.config['near_match_cache'] = os.environ.get('NEAR_MATCH_CACHE', '1').lower() not in ('0', 'false', 'no')
+        self.config['cache_ttl_days'] = float(os.environ.get('TRANSLATION_CACHE_TTL_DAYS', 0))
+        self.config['cache_path'] = os.environ.get(
+            'TRANSLATION_CACHE_PATH',
+            os.path.join(Constants.CACHE_DIR, Constants.TRANSLATION_CACHE_FILE)
+        )
         
         # Logging settings
         log_level = os.environ.get('LOG_LEVEL', 'INFO').upper()
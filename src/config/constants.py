@@ -15,6 +15,7 @@ class Constants:
     SAMPLES_DIR = "samples"
     OUTPUT_DIR = "output"
     TEMP_DIR = "temp"
+    CACHE_DIR = "cache"
     
     # API settings
     DEFAULT_MODEL = "gemini-1.5-pro"
@@ -83,6 +84,21 @@ class Constants:
     
     # Processing defaults
     DEFAULT_BATCH_SIZE = 3
+    DEFAULT_TRANSLATE_CONCURRENCY = 4
+    DEFAULT_PACK_CHARS = 2000  # Source characters per packed prompt; 0 disables packing
+    
+    # Documents with fewer pages of text are rendered in-process; below this,
+    # starting worker processes and registering their fonts costs more than it saves
+    PARALLEL_RENDER_MIN_PAGES = 8
+    
+    # Source texts whose translations each translator keeps in memory
+    TRANSLATION_MEMO_SIZE = 4096
+    
+    # Shorter cleaned texts are kept as-is instead of being sent for translation
+    MIN_TRANSLATE_LENGTH = 3
+    
+    # Translation cache
+    TRANSLATION_CACHE_FILE = "translations.sqlite3"
     
     # Default directories
     FONTS_DIR = "fonts"
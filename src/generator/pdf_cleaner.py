@@ -4,7 +4,9 @@ Module for removing text from PDF documents while preserving other elements.
 
 import logging
 import fitz  # PyMuPDF
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
+
+from src.models.text_element import TextElement
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +16,9 @@ class PDFCleaner:
     Removes text from PDF documents while preserving images, forms, and other elements.
     """
     
+    # Annotation types 3, 4, 8, 9, 10, 11, 12, 13, 22 are text-related
+    TEXT_ANNOTATION_TYPES = frozenset((3, 4, 8, 9, 10, 11, 12, 13, 22))
+    
     @staticmethod
     def remove_text(input_path: str, output_path: str) -> bool:
         """
@@ -33,6 +38,9 @@ class PDFCleaner:
             # Create a new PDF document
             new_pdf = fitz.open()
             
+            # Images already embedded in the new document, keyed by source xref
+            inserted_images: Dict[int, Tuple[int, int, int]] = {}
+            
             # Process each page
             for page_num in range(len(pdf_doc)):
                 page = pdf_doc[page_num]
@@ -41,7 +49,7 @@ class PDFCleaner:
                 new_page = new_pdf.new_page(width=page.rect.width, height=page.rect.height)
                 
                 # Extract and insert images from the original page to the new page
-                PDFCleaner._copy_images(page, new_page)
+                PDFCleaner._copy_images(page, new_page, inserted_images)
                 
                 # Copy form XObjects (complex elements like logos, charts, etc.)
                 PDFCleaner._copy_xobjects(page, new_page)
@@ -65,14 +73,71 @@ class PDFCleaner:
             return False
     
     @staticmethod
-    def _copy_images(page: fitz.Page, new_page: fitz.Page) -> None:
+    def redact_text_boxes(input_path: str, text_elements: List[TextElement]) -> Optional[bytes]:
+        """
+        Remove the text under translated elements by redacting their bounding boxes in place.
+        
+        Unlike remove_text, the original page content is kept as is, so images, XObjects,
+        annotations, links and any untranslated text survive without being copied.
+        
+        The result is returned in memory so the next stage can open it without a disk round trip.
+        
+        Args:
+            input_path: Path to the input PDF
+            text_elements: TextElement objects whose text will be replaced
+            
+        Returns:
+            Bytes of the PDF with text removed, or None on failure
+        """
+        try:
+            # Open the PDF
+            pdf_doc = fitz.open(input_path)
+            
+            # Group redaction rectangles by page
+            rects_by_page: Dict[int, List[fitz.Rect]] = {}
+            for element in text_elements:
+                if not element.is_complete or not 0 <= element.page_number < len(pdf_doc):
+                    continue
+                rect = fitz.Rect(element.x0, element.y0, element.x1, element.y1)
+                rects_by_page.setdefault(element.page_number, []).append(rect)
+            
+            # Redact each page once, leaving images and vector graphics untouched
+            for page_num, rects in rects_by_page.items():
+                page = pdf_doc[page_num]
+                for rect in rects:
+                    # No fill, so the page background stays visible behind the translation
+                    page.add_redact_annot(rect, fill=False)
+                page.apply_redactions(images=fitz.PDF_REDACT_IMAGE_NONE)
+            
+            # Serialize the redacted PDF
+            pdf_bytes = pdf_doc.tobytes()
+            pdf_doc.close()
+            
+            logger.info(f"Redacted {sum(len(rects) for rects in rects_by_page.values())} text boxes")
+            return pdf_bytes
+            
+        except Exception as e:
+            logger.error(f"Error redacting text from PDF: {str(e)}")
+            return None
+    
+    @staticmethod
+    def _copy_images(page: fitz.Page, new_page: fitz.Page, 
+                     inserted_images: Optional[Dict[int, Tuple[int, int, int]]] = None) -> None:
         """
         Copy images from one page to another.
         
+        Images that were already embedded in the destination document are
+        placed again by reference instead of being extracted and re-embedded.
+        
         Args:
             page: Source page
             new_page: Destination page
+            inserted_images: Map of source xref to (new xref, width, height),
+                shared across the pages of one document
         """
+        if inserted_images is None:
+            inserted_images = {}
+            
         try:
             # Try using page.get_images() to get all images
             try:
@@ -84,19 +149,16 @@ class PDFCleaner:
                 image_list = []
             
             # Alternative approach using page.get_drawings() to find images
+            drawings = []
             try:
                 drawings = page.get_drawings()
+                known_xrefs = {img_info[0] for img_info in image_list}
                 drawing_images = []
                 for drawing in drawings:
                     if drawing["type"] == "image" and "xref" in drawing:
                         # Check if this xref is already in our image_list
-                        xref_found = False
-                        for img_info in image_list:
-                            if img_info[0] == drawing["xref"]:
-                                xref_found = True
-                                break
-                        
-                        if not xref_found:
+                        if drawing["xref"] not in known_xrefs:
+                            known_xrefs.add(drawing["xref"])
                             drawing_images.append((drawing["xref"], None, None, None, None))
                 
                 # Add any new images found in drawings to our image_list
@@ -106,34 +168,41 @@ class PDFCleaner:
             except Exception as e:
                 logger.warning(f"Error getting drawings from page {page.number+1}: {str(e)}")
             
+            # Locate every image on the page in one pass
+            image_bboxes = PDFCleaner._get_image_bboxes(page, drawings)
+            
             # Process each image
             for img_index, img_info in enumerate(image_list):
                 try:
                     xref = img_info[0]  # xref number of the image
+                    cached_image = inserted_images.get(xref)
                     
-                    # Try to extract image
-                    try:
-                        base_image = page.parent.extract_image(xref)
-                        if not base_image:
-                            logger.warning(f"Could not extract image {img_index} (xref: {xref}) on page {page.number+1}")
+                    # Try to extract image, unless it is already embedded in the new document
+                    if cached_image is None:
+                        try:
+                            base_image = page.parent.extract_image(xref)
+                            if not base_image:
+                                logger.warning(f"Could not extract image {img_index} (xref: {xref}) on page {page.number+1}")
+                                continue
+                                
+                            image_bytes = base_image.get("image")
+                            if not image_bytes:
+                                logger.warning(f"No image data found for image {img_index} (xref: {xref}) on page {page.number+1}")
+                                continue
+                        except Exception as e:
+                            logger.warning(f"Error extracting image {img_index} (xref: {xref}) on page {page.number+1}: {str(e)}")
                             continue
-                            
-                        image_bytes = base_image.get("image")
-                        if not image_bytes:
-                            logger.warning(f"No image data found for image {img_index} (xref: {xref}) on page {page.number+1}")
-                            continue
-                    except Exception as e:
-                        logger.warning(f"Error extracting image {img_index} (xref: {xref}) on page {page.number+1}: {str(e)}")
-                        continue
+                        
+                        img_width = base_image.get("width", 100)
+                        img_height = base_image.get("height", 100)
+                    else:
+                        new_xref, img_width, img_height = cached_image
                     
                     # Get image position and size info
                     try:
-                        bbox = PDFCleaner._get_image_bbox(page, xref)
+                        bbox = PDFCleaner._get_image_bbox(page, xref, image_bboxes)
                         if not bbox:
                             # If we couldn't determine the bbox from the page, try to create one from the image size
-                            img_width = base_image.get("width", 100)
-                            img_height = base_image.get("height", 100)
-                            
                             # Create a centered rectangle based on image dimensions
                             scale_factor = min(page.rect.width / img_width, page.rect.height / img_height) * 0.8
                             w = img_width * scale_factor
@@ -146,8 +215,12 @@ class PDFCleaner:
                             bbox = fitz.Rect(x0, y0, x0 + w, y0 + h)
                             logger.info(f"Created estimated bbox for image {img_index} (xref: {xref}) on page {page.number+1}")
                         
-                        # Insert image at the position
-                        new_page.insert_image(bbox, stream=image_bytes)
+                        # Insert image at the position, embedding its data only once per document
+                        if cached_image is None:
+                            new_xref = new_page.insert_image(bbox, stream=image_bytes)
+                            inserted_images[xref] = (new_xref, img_width, img_height)
+                        else:
+                            new_page.insert_image(bbox, xref=new_xref)
                         logger.info(f"Successfully copied image {img_index} (xref: {xref}) to page {page.number+1}")
                     except Exception as e:
                         logger.warning(f"Error inserting image {img_index} (xref: {xref}) on page {page.number+1}: {str(e)}")
@@ -186,9 +259,7 @@ class PDFCleaner:
         try:
             for annot in page.annots():
                 # Skip text-related annotations
-                # Types 3, 4, 8, 9, 10, 11, 12, 13, 22 are text-related
-                text_annotation_types = (3, 4, 8, 9, 10, 11, 12, 13, 22)
-                if annot.type[0] not in text_annotation_types:
+                if annot.type[0] not in PDFCleaner.TEXT_ANNOTATION_TYPES:
                     try:
                         new_page.add_annot(annot.rect, annot.type[0], annot.info)
                     except Exception as e:
@@ -215,37 +286,57 @@ class PDFCleaner:
             logger.warning(f"Error copying links on page {page.number+1}: {str(e)}")
     
     @staticmethod
-    def _get_image_bbox(page: fitz.Page, xref: int) -> Optional[fitz.Rect]:
+    def _get_image_bboxes(page: fitz.Page, drawings: List[Dict[str, Any]]) -> Dict[int, fitz.Rect]:
+        """
+        Get the bounding boxes of all images on a page.
+        
+        Args:
+            page: PDF page
+            drawings: Result of page.get_drawings() for this page
+            
+        Returns:
+            Dictionary mapping image xref to its first bounding box on the page
+        """
+        image_bboxes = {}
+        
+        # Method 1: Let PyMuPDF locate all images in a single page traversal
+        try:
+            for info in page.get_image_info(xrefs=True):
+                xref = info.get("xref")
+                if xref and xref not in image_bboxes:
+                    image_bboxes[xref] = fitz.Rect(info["bbox"])
+        except Exception as e:
+            logger.warning(f"Error getting image info on page {page.number+1}: {str(e)}")
+        
+        # Method 2: Images reported by page.get_drawings()
+        for drawing in drawings:
+            if drawing.get("type") == "image" and "xref" in drawing:
+                image_bboxes.setdefault(drawing["xref"], fitz.Rect(drawing["rect"]))
+        
+        return image_bboxes
+    
+    @staticmethod
+    def _get_image_bbox(page: fitz.Page, xref: int, 
+                        image_bboxes: Optional[Dict[int, fitz.Rect]] = None) -> Optional[fitz.Rect]:
         """
         Get the bounding box of an image on a page.
         
         Args:
             page: PDF page
             xref: Image reference
+            image_bboxes: Result of _get_image_bboxes() if already computed for this page
             
         Returns:
             Rectangle bounding box or None if not found
         """
         try:
-            # Get the image rectangle from the page directly using safer methods
-            rect = None
+            if image_bboxes is None:
+                image_bboxes = PDFCleaner._get_image_bboxes(page, page.get_drawings())
             
-            # Method 1: Try to use get_image_bbox if available
-            try:
-                rect = page.get_image_bbox(xref)
-                if rect:
-                    return rect
-            except (AttributeError, Exception) as e:
-                pass  # Silent fail, try next method
-                
-            # Method 2: Try to use page.get_drawings()
-            try:
-                drawings = page.get_drawings()
-                for drawing in drawings:
-                    if drawing["type"] == "image" and drawing.get("xref") == xref:
-                        return fitz.Rect(drawing["rect"])
-            except Exception:
-                pass  # Silent fail, try next method
+            # Method 1 and 2: Look up the image in the page's bounding box map
+            rect = image_bboxes.get(xref)
+            if rect:
+                return rect
                 
             # Method 3: Attempt to extract image dimensions
             try:
@@ -2,14 +2,18 @@
 Module for generating PDFs with translated text.
 """
 
+import io
 import os
 import logging
 import shutil
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
 import fitz  # PyMuPDF
 
+from src.config.app_config import AppConfig
+from src.config.constants import Constants
 from src.models.text_element import TextElement
 from src.generator.text_renderer import TextRenderer
 from src.generator.pdf_cleaner import PDFCleaner
@@ -17,19 +21,62 @@ from src.utils.file_utils import FileUtils
 
 logger = logging.getLogger(__name__)
 
+# Text renderer owned by each page-rendering worker process
+_worker_renderer: Optional[TextRenderer] = None
+
+
+def _init_render_worker(font_path: Optional[str]) -> None:
+    """
+    Register fonts once per worker process.
+    
+    Args:
+        font_path: Path to font file for text rendering, or None to use default
+    """
+    global _worker_renderer
+    _worker_renderer = TextRenderer(font_path)
+
+
+def _render_pages_buffer(pages: List[Tuple[float, float, List[TextElement]]]) -> bytes:
+    """
+    Render the translated text of a run of consecutive pages into one PDF.
+    
+    A single canvas and buffer are reused for every page in the run.
+    
+    Args:
+        pages: List of (page_width, page_height, elements) tuples in page order
+        
+    Returns:
+        Bytes of a PDF with one page per entry in pages
+    """
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer)
+    for page_width, page_height, elements in pages:
+        c.setPageSize((page_width, page_height))
+        if elements:
+            _worker_renderer.add_text_to_canvas(c, elements, page_height)
+        c.showPage()
+    c.save()
+    return buffer.getvalue()
+
 
 class PDFGenerator:
     """
     Generates a PDF document with translated text elements.
     """
     
-    def __init__(self, font_path: Optional[str] = None):
+    def __init__(self, font_path: Optional[str] = None, parallel_min_pages: Optional[int] = None):
         """
         Initialize the PDF Generator.
         
         Args:
             font_path: Path to font file for text rendering, or None to use default
+            parallel_min_pages: Minimum number of pages with text before rendering
+                                uses worker processes, or None to use the configured value
         """
+        if parallel_min_pages is None:
+            parallel_min_pages = AppConfig().get('parallel_render_min_pages', Constants.PARALLEL_RENDER_MIN_PAGES)
+        self.parallel_min_pages = max(2, parallel_min_pages)
+        self.font_path = font_path
         self.text_renderer = TextRenderer(font_path)
         self.temp_dir = "temp"
         FileUtils.ensure_directory_exists(self.temp_dir)
@@ -54,22 +101,26 @@ class PDFGenerator:
         try:
             logger.info(f"Generating translated PDF from {original_pdf_path} to {output_pdf_path}")
             
-            # Create a clean PDF without text
-            clean_pdf_path = os.path.join(self.temp_dir, "clean_pdf.pdf")
-            PDFCleaner.remove_text(original_pdf_path, clean_pdf_path)
+            # Nothing was translated, so the output would match the original
+            if not any(element.is_complete for element in translated_elements):
+                logger.warning("No translated text elements, copying original PDF unchanged")
+                shutil.copyfile(original_pdf_path, output_pdf_path)
+                return True
+            
+            # Create a clean PDF in memory without the text that is being replaced
+            clean_pdf_bytes = PDFCleaner.redact_text_boxes(original_pdf_path, translated_elements)
+            if clean_pdf_bytes is None:
+                logger.error("Could not remove the original text from the PDF")
+                return False
             
             # Get document dimensions from original PDF
             doc_info = self._get_document_info(original_pdf_path)
             
             # Generate PDF pages with translated text only
-            text_pdf_path = os.path.join(self.temp_dir, "text_pdf.pdf")
-            self._generate_text_pdf(text_pdf_path, translated_elements, doc_info)
+            text_pdf_bytes = self._generate_text_pdf(translated_elements, doc_info)
             
             # Merge the clean PDF and text PDF
-            self._merge_pdfs(clean_pdf_path, text_pdf_path, output_pdf_path)
-            
-            # Clean up temporary files
-            self._cleanup_temp_files([clean_pdf_path, text_pdf_path])
+            self._merge_pdfs(clean_pdf_bytes, text_pdf_bytes, output_pdf_path)
             
             logger.info(f"Successfully generated translated PDF at {output_pdf_path}")
             return True
@@ -86,9 +137,10 @@ class PDFGenerator:
             pdf_path: Path to the PDF file
             
         Returns:
-            Dictionary with document information
+            Dictionary with the page count and per-page "widths", "heights"
+            and "rotations" lists
         """
-        doc_info = {"pages": []}
+        doc_info = {"page_count": 0, "widths": [], "heights": [], "rotations": []}
         
         try:
             # Open the PDF document
@@ -97,15 +149,15 @@ class PDFGenerator:
             # Get general document information
             doc_info["page_count"] = len(pdf_doc)
             
-            # Get page-specific information
-            for page_num in range(len(pdf_doc)):
-                page = pdf_doc[page_num]
-                page_info = {
-                    "width": page.rect.width,
-                    "height": page.rect.height,
-                    "rotation": page.rotation
-                }
-                doc_info["pages"].append(page_info)
+            # Get page-specific information as parallel lists indexed by page number
+            widths = doc_info["widths"]
+            heights = doc_info["heights"]
+            rotations = doc_info["rotations"]
+            for page in pdf_doc:
+                rect = page.rect
+                widths.append(rect.width)
+                heights.append(rect.height)
+                rotations.append(page.rotation)
             
             # Close the document
             pdf_doc.close()
@@ -115,14 +167,16 @@ class PDFGenerator:
             
         return doc_info
     
-    def _generate_text_pdf(self, output_path: str, text_elements: List[TextElement], doc_info: Dict[str, Any]) -> None:
+    def _generate_text_pdf(self, text_elements: List[TextElement], doc_info: Dict[str, Any]) -> bytes:
         """
         Generate a PDF with only translated text.
         
         Args:
-            output_path: Path where the text-only PDF will be saved
             text_elements: List of TextElement objects with translated text
             doc_info: Dictionary with document information
+            
+        Returns:
+            Bytes of the text-only PDF
         """
         try:
             # Log the number of text elements
@@ -133,26 +187,26 @@ class PDFGenerator:
                 logger.info(f"Element {i}: text='{element.text[:20]}...', translated_text={element.translated_text is not None}, translated={element.is_complete}")
             
             # Group text elements by page
-            elements_by_page = {}
-            for element in text_elements:
-                page_num = element.page_number
-                if page_num not in elements_by_page:
-                    elements_by_page[page_num] = []
-                elements_by_page[page_num].append(element)
+            elements_by_page = self._group_elements_by_page(text_elements, doc_info["page_count"])
             
-            # Log elements by page
-            for page_num, elements in elements_by_page.items():
-                logger.info(f"Page {page_num}: {len(elements)} elements")
+            # Pages are independent, so render them across CPU cores when there are
+            # enough of them to pay for starting the workers
+            pages_with_text = [page_num for page_num, elements in enumerate(elements_by_page) if elements]
+            if len(pages_with_text) >= self.parallel_min_pages and (os.cpu_count() or 1) > 1:
+                return self._generate_text_pdf_parallel(elements_by_page, pages_with_text, doc_info)
             
             # Create a new PDF with ReportLab
-            c = canvas.Canvas(output_path)
+            buffer = io.BytesIO()
+            c = canvas.Canvas(buffer)
+            
+            widths = doc_info["widths"]
+            heights = doc_info["heights"]
             
             # Process each page
             for page_num in range(doc_info["page_count"]):
-                if page_num in elements_by_page:
-                    page_info = doc_info["pages"][page_num]
-                    width = page_info["width"]
-                    height = page_info["height"]
+                if elements_by_page[page_num]:
+                    width = widths[page_num]
+                    height = heights[page_num]
                     
                     # Set page size to match original
                     c.setPageSize((width, height))
@@ -174,35 +228,109 @@ class PDFGenerator:
             
             # Save the PDF
             c.save()
-            logger.info(f"Text PDF saved to {output_path}")
+            logger.info(f"Text PDF generated with {doc_info['page_count']} pages")
+            return buffer.getvalue()
             
         except Exception as e:
             logger.error(f"Error generating text PDF: {str(e)}")
             raise
     
-    def _merge_pdfs(self, clean_pdf_path: str, text_pdf_path: str, output_path: str) -> None:
+    def _group_elements_by_page(self, text_elements: List[TextElement], page_count: int) -> List[List[TextElement]]:
+        """
+        Bucket text elements by page number in a single pass.
+        
+        Args:
+            text_elements: List of TextElement objects
+            page_count: Number of pages in the document
+            
+        Returns:
+            List indexed by page number of that page's elements in reading order
+        """
+        elements_by_page = [[] for _ in range(page_count)]
+        
+        for element in text_elements:
+            page_num = element.page_number
+            if 0 <= page_num < page_count:
+                elements_by_page[page_num].append(element)
+            else:
+                logger.warning(f"Skipping text element on out-of-range page {page_num}")
+        
+        # Sort each page once into reading order (top to bottom, left to right)
+        for elements in elements_by_page:
+            if len(elements) > 1:
+                elements.sort(key=lambda e: (e.y0, e.x0))
+        
+        return elements_by_page
+    
+    def _generate_text_pdf_parallel(
+        self, 
+        elements_by_page: List[List[TextElement]], 
+        pages_with_text: List[int], 
+        doc_info: Dict[str, Any]
+    ) -> bytes:
+        """
+        Generate the text-only PDF by rendering pages in a process pool.
+        
+        Args:
+            elements_by_page: Text elements grouped by page number, indexed by page
+            pages_with_text: Page numbers that have text elements
+            doc_info: Dictionary with document information
+            
+        Returns:
+            Bytes of the text-only PDF
+        """
+        widths = doc_info["widths"]
+        heights = doc_info["heights"]
+        page_count = doc_info["page_count"]
+        max_workers = min(os.cpu_count() or 1, len(pages_with_text))
+        
+        # Split the document into one run of consecutive pages per worker
+        chunk_size = (page_count + max_workers - 1) // max_workers
+        chunks = [
+            [(widths[page_num], heights[page_num], elements_by_page[page_num]) 
+             for page_num in range(start, min(start + chunk_size, page_count))]
+            for start in range(0, page_count, chunk_size)
+        ]
+        
+        logger.info(f"Rendering {len(pages_with_text)} pages with {max_workers} worker processes")
+        
+        with ProcessPoolExecutor(
+            max_workers=max_workers, 
+            initializer=_init_render_worker, 
+            initargs=(self.font_path,)
+        ) as executor:
+            chunk_buffers = list(executor.map(_render_pages_buffer, chunks))
+        
+        # Assemble the rendered runs in page order
+        text_doc = fitz.open()
+        for buffer in chunk_buffers:
+            chunk_doc = fitz.open("pdf", buffer)
+            text_doc.insert_pdf(chunk_doc)
+            chunk_doc.close()
+        
+        text_pdf_bytes = text_doc.tobytes()
+        text_doc.close()
+        logger.info(f"Text PDF generated with {page_count} pages")
+        return text_pdf_bytes
+    
+    def _merge_pdfs(self, clean_pdf_bytes: bytes, text_pdf_bytes: bytes, output_path: str) -> None:
         """
         Merge a clean PDF (without text) and a text-only PDF.
         
         Args:
-            clean_pdf_path: Path to PDF with images and other non-text elements
-            text_pdf_path: Path to PDF with only text elements
+            clean_pdf_bytes: Bytes of the PDF with the translated text removed
+            text_pdf_bytes: Bytes of the PDF with only text elements
             output_path: Path where the merged PDF will be saved
         """
         try:
             # Open the source PDFs
-            pdf_clean = fitz.open(clean_pdf_path)
-            pdf_text = fitz.open(text_pdf_path)
+            pdf_clean = fitz.open("pdf", clean_pdf_bytes)
+            pdf_text = fitz.open("pdf", text_pdf_bytes)
             
             # Debug info about PDFs
             logger.info(f"Clean PDF has {len(pdf_clean)} pages")
             logger.info(f"Text PDF has {len(pdf_text)} pages")
             
-            # Check if text PDF pages are empty
-            for page_num in range(len(pdf_text)):
-                text_content = pdf_text[page_num].get_text("text")
-                logger.info(f"Text PDF page {page_num} text length: {len(text_content)}")
-            
             # Create a new PDF document
             pdf_result = fitz.open()
             
@@ -212,21 +340,16 @@ class PDFGenerator:
             for page_num in range(max_pages):
                 # Determine page dimensions - use the clean PDF if available, otherwise the text PDF
                 if page_num < len(pdf_clean):
-                    width = pdf_clean[page_num].rect.width
-                    height = pdf_clean[page_num].rect.height
+                    rect = pdf_clean[page_num].rect
                 elif page_num < len(pdf_text):
-                    width = pdf_text[page_num].rect.width
-                    height = pdf_text[page_num].rect.height
+                    rect = pdf_text[page_num].rect
                 else:
                     # This shouldn't happen due to max_pages, but just in case
                     continue
                 
                 # Create a new page in the result PDF
-                result_page = pdf_result.new_page(width=width, height=height)
-                logger.info(f"Created result page {page_num} with dimensions {width}x{height}")
-                
-                # The key issue is in these next sections. Instead of just using show_pdf_page,
-                # we'll use a more direct approach to copying content
+                result_page = pdf_result.new_page(width=rect.width, height=rect.height)
+                logger.info(f"Created result page {page_num} with dimensions {rect.width}x{rect.height}")
                 
                 # Add content from the clean page (images, etc.) if it exists
                 if page_num < len(pdf_clean):
@@ -234,49 +357,25 @@ class PDFGenerator:
                         # Check if clean page has content
                         clean_has_content = False
                         try:
-                            # Try to get some content - images or xobjects
-                            if pdf_clean[page_num].get_images() or pdf_clean[page_num].get_xobjects():
+                            # Any content stream may hold images, vector graphics or untranslated text
+                            if pdf_clean[page_num].get_contents():
                                 clean_has_content = True
                         except Exception:
                             # If we can't check content, assume there might be some
                             clean_has_content = True
                         
                         if clean_has_content:
-                            # Create a temporary file for this clean page
-                            temp_clean_page_path = os.path.join(self.temp_dir, f"temp_clean_page_{page_num}.pdf")
-                            temp_clean_doc = fitz.open()
-                            temp_page = temp_clean_doc.new_page(width=width, height=height)
-                            
-                            # Copy content from clean PDF to temp page using PyMuPDF's more direct approach
-                            clean_page = pdf_clean[page_num]
-                            temp_page.show_pdf_page(
-                                temp_page.rect,
-                                pdf_clean,
-                                page_num,
-                                clip=None,  # No clipping
-                                keep_proportion=True,
-                                overlay=True  # Important: overlay content
-                            )
-                            
-                            # Save temp doc
-                            temp_clean_doc.save(temp_clean_page_path)
-                            temp_clean_doc.close()
-                            
-                            # Now add this to our result page
+                            # Reference the clean page directly as the base layer
                             result_page.show_pdf_page(
                                 result_page.rect,
-                                fitz.open(temp_clean_page_path),
-                                0,  # First page of temp doc
+                                pdf_clean,
+                                page_num,
                                 clip=None,
                                 keep_proportion=True,
                                 overlay=False  # Base layer
                             )
                             
                             logger.info(f"Added content from clean PDF page {page_num}")
-                            
-                            # Clean up temp file
-                            if os.path.exists(temp_clean_page_path):
-                                os.remove(temp_clean_page_path)
                         else:
                             logger.warning(f"Clean PDF page {page_num} appears to be empty, skipping")
                     except Exception as e:
@@ -287,47 +386,24 @@ class PDFGenerator:
                     try:
                         # Check if the text page is empty
                         if pdf_text[page_num].get_text("text").strip():
-                            # Create a temporary file for this text page
-                            temp_text_page_path = os.path.join(self.temp_dir, f"temp_text_page_{page_num}.pdf")
-                            temp_text_doc = fitz.open()
-                            temp_page = temp_text_doc.new_page(width=width, height=height)
-                            
-                            # Copy content from text PDF to temp page
-                            temp_page.show_pdf_page(
-                                temp_page.rect,
-                                pdf_text,
-                                page_num,
-                                clip=None,  # No clipping
-                                keep_proportion=True,
-                                overlay=True  # Important: overlay content
-                            )
-                            
-                            # Save temp doc
-                            temp_text_doc.save(temp_text_page_path)
-                            temp_text_doc.close()
-                            
-                            # Now add this to our result page
+                            # Reference the text page directly on top of the images
                             result_page.show_pdf_page(
                                 result_page.rect,
-                                fitz.open(temp_text_page_path),
-                                0,  # First page of temp doc
+                                pdf_text,
+                                page_num,
                                 clip=None,
                                 keep_proportion=True,
                                 overlay=True  # Overlay on top of images
                             )
                             
                             logger.info(f"Added content from text PDF page {page_num}")
-                            
-                            # Clean up temp file
-                            if os.path.exists(temp_text_page_path):
-                                os.remove(temp_text_page_path)
                         else:
                             logger.warning(f"Text PDF page {page_num} appears to be empty, skipping")
                     except Exception as e:
                         logger.error(f"Error showing text page {page_num}: {str(e)}")
             
-            # Save the result
-            pdf_result.save(output_path)
+            # Save the result with compressed streams
+            pdf_result.save(output_path, deflate=True)
             logger.info(f"Saved merged PDF to {output_path}")
             
             # Close all documents
@@ -347,11 +423,12 @@ class PDFGenerator:
             file_paths: List of file paths to delete
         """
         for file_path in file_paths:
-            if os.path.exists(file_path):
-                try:
-                    os.remove(file_path)
-                except Exception as e:
-                    logger.warning(f"Error cleaning up temp file {file_path}: {str(e)}")
+            try:
+                os.unlink(file_path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Error cleaning up temp file {file_path}: {str(e)}")
                     
     def add_metadata(self, pdf_path: str, metadata: Dict[str, str]) -> bool:
         """
@@ -386,8 +463,7 @@ class PDFGenerator:
             pdf_doc.close()
             
             # Remove temp file
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+            self._cleanup_temp_files([temp_path])
             
             logger.info(f"Successfully updated metadata for {pdf_path}")
             return True
@@ -10,7 +10,8 @@ from reportlab.pdfbase.ttfonts import TTFont
 
 from src.models.text_element import TextElement
 from src.utils.rtl_handler import RTLHandler
-from src.utils.font_utils import register_persian_fonts, get_text_width
+from src.utils.font_utils import register_persian_fonts
+from src.utils.layout import wrap_lines, find_optimal_font_size
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +31,9 @@ class TextRenderer:
         # Register Persian fonts
         self.default_font = register_persian_fonts()
         logger.info(f"Using {self.default_font} as default font")
+        
+        # Registered font names, looked up once per element in _determine_font
+        self._registered_fonts = frozenset(pdfmetrics.getRegisteredFontNames())
     
     def add_text_to_canvas(self, c: canvas.Canvas, text_elements: List[TextElement], page_height: float) -> None:
         """
@@ -40,37 +44,58 @@ class TextRenderer:
             text_elements: List of TextElement objects to render
             page_height: Height of the page in points
         """
+        # Offset that converts PDF y coordinates (origin at top-left) to canvas ones,
+        # with some extra margin at the top to avoid text being cut off
+        y_offset = page_height - 2
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        
+        # First lay out every element (wrapping, font sizing, shaping), then draw them all
+        layouts = []
         for i, element in enumerate(text_elements):
-            # Skip elements without translated text
-            if not element.translated_text or element.translated_text.isspace():
+            translated_text = element.translated_text
+            
+            # Skip elements without translated text, and failed translations whose
+            # original text was left on the page
+            if not element.is_complete or not translated_text or translated_text.isspace():
                 continue
             
-            # Get element position and dimensions
+            # Get element position and dimensions, with at least a minimum width and height
             x = element.x0
-            y = page_height - element.y1  # Convert from PDF coordinates (origin at bottom-left)
-            width = element.width
-            height = element.height
+            y = y_offset - element.y1
+            width = max(element.width, 10)
+            height = max(element.height, 10)
             
             # Debug log for text positioning
-            logger.info(f"Rendering text element {i}: pos=({x}, {y}), size=({width}x{height}), text='{element.translated_text[:30]}...'")
+            if debug_enabled:
+                logger.debug(f"Rendering text element {i}: pos=({x}, {y}), size=({width}x{height}), text='{translated_text[:30]}...'")
             
             # Determine font and size
             font_name, font_size = self._determine_font(element)
             
-            # Set font
-            c.setFont(font_name, font_size)
-            
-            # Make sure we have at least a minimum width and height
-            if width < 10:
-                width = 10
-            if height < 10:
-                height = 10
+            # Detect the text direction once per element and keep it for later renders
+            is_rtl = element.is_rtl
+            if is_rtl is None:
+                is_rtl = element.is_rtl = RTLHandler.is_persian(translated_text)
                 
-            # Add some extra margin at the top to avoid text being cut off
-            y = y - 2
-                
-            # Render the text
-            self._render_text_block(c, element.translated_text, x, y, width, height, font_name, font_size, None)
+            # Lay out the text
+            font_size, draw_ops = self._layout_text_block(translated_text, x, y, width, height, font_name, font_size,
+                                                          None, is_rtl=is_rtl)
+            layouts.append((font_name, font_size, tuple(element.color), draw_ops))
+        
+        # Group blocks that share font and color so the canvas state changes as rarely as possible
+        layouts.sort(key=lambda layout: layout[:3])
+        
+        # Drawing is the only step that touches the canvas
+        last_font = None
+        last_color = None
+        for font_name, font_size, color, draw_ops in layouts:
+            if (font_name, font_size) != last_font:
+                c.setFont(font_name, font_size)
+                last_font = (font_name, font_size)
+            if color != last_color:
+                c.setFillColorRGB(*color)
+                last_color = color
+            self._draw_text_block(c, draw_ops)
     
     def _determine_font(self, element: TextElement) -> Tuple[str, float]:
         """
@@ -86,7 +111,7 @@ class TextRenderer:
         font_name = element.font_name if element.font_name else self.default_font
         
         # Check if font is registered, otherwise use default
-        if font_name not in pdfmetrics.getRegisteredFontNames():
+        if font_name not in self._registered_fonts:
             font_name = self.default_font
         
         # Use element's font size if available, otherwise use default
@@ -97,123 +122,37 @@ class TextRenderer:
         
         return font_name, font_size
     
-    def _find_optimal_font_size(self, text: str, max_width: float, max_height: float, 
-                              font_name: str, starting_font_size: float) -> float:
+    def _render_text_block(self, c: canvas.Canvas, text: str, x: float, y: float, 
+                         width: float, height: float, font_name: str, font_size: float, 
+                         alignment: Optional[str] = None, is_rtl: Optional[bool] = None) -> None:
         """
-        Find the optimal font size to fit text within given dimensions.
+        Render a block of text on the canvas.
         
         Args:
+            c: ReportLab canvas
             text: Text to render
-            max_width: Maximum width
-            max_height: Maximum height
-            font_name: Font name
-            starting_font_size: Initial font size
-            
-        Returns:
-            Optimal font size
-        """
-        font_size = starting_font_size
-        min_font_size = 6.0  # Minimum readable font size
-        
-        # Try decreasing font sizes until text fits
-        while font_size >= min_font_size:
-            # Check if text fits with current font size
-            lines = self._wrap_text(text, max_width, font_name, font_size)
-            line_height = font_size * 1.2
-            total_height = len(lines) * line_height
-            
-            if total_height <= max_height:
-                return font_size
-            
-            # Reduce font size and try again
-            font_size *= 0.9  # Reduce by 10%
-        
-        # Return minimum font size if we couldn't find a better fit
-        return min_font_size
-    
-    def _wrap_text(self, text: str, max_width: float, font_name: str, font_size: float) -> List[str]:
-        """
-        Wrap text to fit within a maximum width.
-        
-        Args:
-            text: Text to wrap
-            max_width: Maximum width in points
+            x: X coordinate (left)
+            y: Y coordinate (top)
+            width: Width of text block
+            height: Height of text block
             font_name: Font name
             font_size: Font size
-            
-        Returns:
-            List of wrapped text lines
+            alignment: Text alignment ('left', 'right', 'center', or 'justify')
+            is_rtl: Whether the text is Persian, or None to detect it
         """
-        # Handle empty text
-        if not text or text.isspace():
-            return []
-        
-        # For Persian text, we need special handling
-        is_persian = RTLHandler.is_persian(text)
-        
-        # Split text into lines based on newlines
-        paragraphs = text.split('\n')
-        result_lines = []
-        
-        for paragraph in paragraphs:
-            if not paragraph:
-                result_lines.append('')
-                continue
-            
-            # For Persian text, we need to handle wrapping differently
-            if is_persian:
-                # Split into words
-                words = paragraph.split()
-                current_line = []
-                current_width = 0
-                
-                for word in words:
-                    word_width = get_text_width(word, font_name, font_size)
-                    
-                    # Check if adding this word would exceed max width
-                    if current_width + word_width <= max_width or not current_line:
-                        current_line.append(word)
-                        current_width += word_width + get_text_width(' ', font_name, font_size)
-                    else:
-                        # Add current line to result and start a new line
-                        result_lines.append(' '.join(current_line))
-                        current_line = [word]
-                        current_width = word_width
-                
-                # Add the last line
-                if current_line:
-                    result_lines.append(' '.join(current_line))
-            else:
-                # For non-Persian text, simpler approach
-                words = paragraph.split()
-                current_line = []
-                current_width = 0
-                
-                for word in words:
-                    word_width = get_text_width(word, font_name, font_size)
-                    space_width = get_text_width(' ', font_name, font_size)
-                    
-                    if current_width + word_width + (space_width if current_line else 0) <= max_width or not current_line:
-                        current_line.append(word)
-                        current_width += word_width + (space_width if current_line else 0)
-                    else:
-                        result_lines.append(' '.join(current_line))
-                        current_line = [word]
-                        current_width = word_width
-                
-                if current_line:
-                    result_lines.append(' '.join(current_line))
-        
-        return result_lines
+        font_size, draw_ops = self._layout_text_block(text, x, y, width, height, font_name, font_size,
+                                                      alignment, is_rtl)
+        c.setFont(font_name, font_size)
+        self._draw_text_block(c, draw_ops)
     
-    def _render_text_block(self, c: canvas.Canvas, text: str, x: float, y: float, 
-                         width: float, height: float, font_name: str, font_size: float, 
-                         alignment: Optional[str] = None) -> None:
+    def _layout_text_block(self, text: str, x: float, y: float, 
+                           width: float, height: float, font_name: str, font_size: float, 
+                           alignment: Optional[str] = None, 
+                           is_rtl: Optional[bool] = None) -> Tuple[float, List[Tuple[str, float, float, str]]]:
         """
-        Render a block of text on the canvas.
+        Lay out a block of text without touching the canvas.
         
         Args:
-            c: ReportLab canvas
             text: Text to render
             x: X coordinate (left)
             y: Y coordinate (top)
@@ -222,9 +161,13 @@ class TextRenderer:
             font_name: Font name
             font_size: Font size
             alignment: Text alignment ('left', 'right', 'center', or 'justify')
+            is_rtl: Whether the text is Persian, or None to detect it
+            
+        Returns:
+            Tuple of (final font size, list of (alignment, anchor x, y, line) draw operations)
         """
-        # Determine if text is Persian
-        is_persian = RTLHandler.is_persian(text)
+        # Determine if text is Persian, unless the caller already knows
+        is_persian = RTLHandler.is_persian(text) if is_rtl is None else is_rtl
         
         # Determine text alignment
         if alignment is None:
@@ -239,7 +182,7 @@ class TextRenderer:
             max_width = 10
         
         # Wrap text to fit within width
-        lines = self._wrap_text(text, max_width, font_name, font_size)
+        lines = wrap_lines(text, max_width, font_name, font_size)
         
         # Calculate line height
         line_height = font_size * 1.2
@@ -248,16 +191,23 @@ class TextRenderer:
         total_height = len(lines) * line_height
         if total_height > height:
             # Try to find a smaller font size that fits
-            adjusted_font_size = self._find_optimal_font_size(text, max_width, height, font_name, font_size)
+            adjusted_font_size = find_optimal_font_size(text, max_width, height, font_name, font_size)
             
             if adjusted_font_size != font_size:
                 # Update font size and recalculate
                 font_size = adjusted_font_size
-                c.setFont(font_name, font_size)
-                lines = self._wrap_text(text, max_width, font_name, font_size)
+                lines = wrap_lines(text, max_width, font_name, font_size)
                 line_height = font_size * 1.2
         
-        # Render each line
+        # Anchor point for the alignment
+        if alignment == 'right':
+            anchor_x = x + width - margin
+        elif alignment == 'center':
+            anchor_x = x + (width / 2)
+        else:  # left or justify (we don't implement justify yet)
+            anchor_x = x + margin
+        
+        draw_ops = []
         for i, line in enumerate(lines):
             if not line:
                 continue
@@ -273,10 +223,23 @@ class TextRenderer:
             if is_persian:
                 line = RTLHandler.prepare_persian_text(line)
             
-            # Render based on alignment
+            draw_ops.append((alignment, anchor_x, line_y, line))
+        
+        return font_size, draw_ops
+    
+    def _draw_text_block(self, c: canvas.Canvas, draw_ops: List[Tuple[str, float, float, str]]) -> None:
+        """
+        Draw a laid out block of text on the canvas using its current font and color.
+        
+        Args:
+            c: ReportLab canvas
+            draw_ops: List of (alignment, anchor x, y, line) from _layout_text_block
+        """
+        # Render based on alignment
+        for alignment, anchor_x, line_y, line in draw_ops:
             if alignment == 'right':
-                c.drawRightString(x + width - margin, line_y, line)
+                c.drawRightString(anchor_x, line_y, line)
             elif alignment == 'center':
-                c.drawCentredString(x + (width / 2), line_y, line)
-            else:  # left or justify (we don't implement justify yet)
-                c.drawString(x + margin, line_y, line) 
\ No newline at end of file
+                c.drawCentredString(anchor_x, line_y, line)
+            else:
+                c.drawString(anchor_x, line_y, line)
\ No newline at end of file
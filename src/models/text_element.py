@@ -11,6 +11,13 @@ class TextElement:
     Contains the original text, position, font information, and translated text.
     """
     
+    # Fixed attribute layout: documents hold thousands of elements and the renderer
+    # reads their attributes in its per-element loop
+    __slots__ = (
+        'text', 'page_number', 'x0', 'y0', 'x1', 'y1', 'width', 'height',
+        'font_name', 'font_size', 'color', 'alignment', 'translated_text', 'is_complete', 'is_rtl'
+    )
+    
     def __init__(
         self,
         text: str,
@@ -43,20 +50,28 @@ class TextElement:
             color: RGB color tuple (0-1 range)
             alignment: Text alignment ('left', 'right', 'center', or 'justify')
         """
+        # Coordinates are coerced to float once here, so consumers never see
+        # Decimal or other numeric types coming from the PDF libraries
+        x0 = float(x0)
+        y0 = float(y0)
+        x1 = float(x1)
+        y1 = float(y1)
+        
         self.text = text
         self.page_number = page_number
         self.x0 = x0
         self.y0 = y0
         self.x1 = x1
         self.y1 = y1
-        self.width = width if width is not None else (x1 - x0)
-        self.height = height if height is not None else (y1 - y0)
+        self.width = float(width) if width is not None else (x1 - x0)
+        self.height = float(height) if height is not None else (y1 - y0)
         self.font_name = font_name
-        self.font_size = font_size
+        self.font_size = float(font_size) if font_size is not None else None
         self.color = color or (0, 0, 0)  # Default to black
         self.alignment = alignment
         self.translated_text = None
         self.is_complete = False  # Flag to track if translation is complete
+        self.is_rtl = None  # Direction of translated_text, detected once when first rendered
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'TextElement':
@@ -72,14 +87,14 @@ class TextElement:
         return cls(
             text=data.get('text', ''),
             page_number=data.get('page', 0),
-            x0=float(data.get('x0', 0)),
-            y0=float(data.get('y0', 0)),
-            x1=float(data.get('x1', 0)),
-            y1=float(data.get('y1', 0)),
-            width=float(data.get('width', 0)) if 'width' in data else None,
-            height=float(data.get('height', 0)) if 'height' in data else None,
+            x0=data.get('x0', 0),
+            y0=data.get('y0', 0),
+            x1=data.get('x1', 0),
+            y1=data.get('y1', 0),
+            width=data.get('width'),
+            height=data.get('height'),
             font_name=data.get('font_name'),
-            font_size=float(data.get('font_size', 12)) if 'font_size' in data else None,
+            font_size=data.get('font_size'),
             color=data.get('color'),
             alignment=data.get('alignment')
         )
@@ -117,6 +132,7 @@ class TextElement:
         """
         self.translated_text = translated_text
         self.is_complete = True
+        self.is_rtl = None
     
     def get_position(self) -> Tuple[float, float]:
         """
@@ -3,6 +3,7 @@ Error handler for translation processes.
 """
 
 import logging
+import re
 import time
 from typing import Optional, Any, Dict, Callable, TypeVar
 
@@ -13,6 +14,15 @@ logger = logging.getLogger(__name__)
 # Define a generic type for function return
 T = TypeVar('T')
 
+# Keyword patterns for classify_error; each is one scan over the error message
+_RATE_LIMIT_RE = re.compile(r'rate limit|quota|too many requests')
+_AUTH_RE = re.compile(r'auth|key|permission')  # 'auth' also covers 'unauthorized'
+_CONNECTION_RE = re.compile(r'connection|timeout|network')
+_FILTER_RE = re.compile(r'filter|policy|block')
+
+# Error types raised by requests that reached the server
+_SERVER_ERROR_TYPES = frozenset(("rate_limit", "api_error"))
+
 
 class TranslationError(Exception):
     """Base exception for translation errors."""
@@ -68,10 +78,10 @@ class ErrorHandler:
         Returns:
             Dictionary with error classification
         """
-        error_str = str(error).lower()
+        error_str = str(error).casefold()
         
         # Check for rate limit errors
-        if "rate limit" in error_str or "quota" in error_str or "too many requests" in error_str:
+        if _RATE_LIMIT_RE.search(error_str):
             return {
                 "type": "rate_limit",
                 "retryable": True,
@@ -80,7 +90,7 @@ class ErrorHandler:
             }
             
         # Check for authentication errors
-        elif "auth" in error_str or "key" in error_str or "permission" in error_str or "unauthorized" in error_str:
+        elif _AUTH_RE.search(error_str):
             return {
                 "type": "authentication",
                 "retryable": False,
@@ -88,7 +98,7 @@ class ErrorHandler:
             }
             
         # Check for connection errors
-        elif "connection" in error_str or "timeout" in error_str or "network" in error_str:
+        elif _CONNECTION_RE.search(error_str):
             return {
                 "type": "connection",
                 "retryable": True,
@@ -97,7 +107,7 @@ class ErrorHandler:
             }
             
         # Check for content filter errors
-        elif "content" in error_str and ("filter" in error_str or "policy" in error_str or "block" in error_str):
+        elif "content" in error_str and _FILTER_RE.search(error_str):
             return {
                 "type": "content_filter",
                 "retryable": False,
@@ -129,27 +139,23 @@ class ErrorHandler:
             TranslationError: If all retries fail or non-retryable error occurs
         """
         max_retries = self.rate_limiter.max_retries
+        delay = None
         
         for attempt in range(1, max_retries + 2):  # +2 because first attempt is not a retry
+            # Wait for rate limit capacity and reserve a slot for this request
+            reservation = self.rate_limiter.wait_if_needed()
             try:
-                # Check rate limits before making the request
-                self.rate_limiter.wait_if_needed()
-                
                 # Make the request
-                result = func(*args, **kwargs)
-                
-                # Record the request
-                self.rate_limiter.record_request()
-                
-                return result
+                return func(*args, **kwargs)
                 
             except Exception as e:
-                # Record the error attempt
-                self.rate_limiter.record_request()
-                
                 # Classify the error
                 error_info = self.classify_error(e)
                 
+                # Only failures that reached the API count against the rate budget
+                if error_info["type"] not in _SERVER_ERROR_TYPES:
+                    self.rate_limiter.release_request(reservation)
+                
                 # If this is the last attempt or error is not retryable, raise
                 if attempt > max_retries or not error_info.get("retryable", False):
                     # Convert to appropriate exception type
@@ -157,12 +163,16 @@ class ErrorHandler:
                     logger.error(f"Error during translation: {str(e)} (type: {error_info['type']})")
                     raise error_category(str(e))
                     
-                # Get delay for this attempt
-                delay = error_info.get("delay") or self.rate_limiter.get_retry_delay(attempt)
+                # Rate limit errors wait as long as the API asks; others back off
+                # with decorrelated jitter from their category's base delay
+                if error_info["type"] == "rate_limit":
+                    delay = error_info["delay"]
+                else:
+                    delay = self.rate_limiter.get_retry_delay(attempt, delay, error_info.get("delay"))
                 
                 # Log retry information
                 logger.warning(f"Attempt {attempt}/{max_retries} failed: {str(e)}. "
                               f"Retrying in {delay:.1f} seconds...")
                 
                 # Wait before retrying
-                time.sleep(delay) 
\ No newline at end of file
+                time.sleep(delay)
@@ -2,7 +2,7 @@
 Prompt templates for different translation domains.
 """
 
-from typing import Dict
+from typing import Dict, Optional
 from src.config.constants import Constants
 
 
@@ -81,6 +81,28 @@ class PromptTemplates:
 
 {text}"""
     
+    # Domain -> template lookup, built on first use
+    _TEMPLATES: Optional[Dict[str, str]] = None
+    
+    @classmethod
+    def _template_map(cls) -> Dict[str, str]:
+        """
+        Get the shared domain -> template dictionary, building it once.
+        
+        Returns:
+            Dictionary of prompt templates by domain
+        """
+        if cls._TEMPLATES is None:
+            cls._TEMPLATES = {
+                Constants.DOMAIN_GENERAL: cls.GENERAL,
+                Constants.DOMAIN_SCIENTIFIC: cls.SCIENTIFIC,
+                Constants.DOMAIN_GENETIC: cls.GENETIC,
+                Constants.DOMAIN_MEDICAL: cls.MEDICAL,
+                Constants.DOMAIN_LEGAL: cls.LEGAL,
+                Constants.DOMAIN_TECHNICAL: cls.TECHNICAL
+            }
+        return cls._TEMPLATES
+    
     @classmethod
     def get_templates(cls) -> Dict[str, str]:
         """
@@ -89,14 +111,7 @@ class PromptTemplates:
         Returns:
             Dictionary of prompt templates by domain
         """
-        return {
-            Constants.DOMAIN_GENERAL: cls.GENERAL,
-            Constants.DOMAIN_SCIENTIFIC: cls.SCIENTIFIC,
-            Constants.DOMAIN_GENETIC: cls.GENETIC,
-            Constants.DOMAIN_MEDICAL: cls.MEDICAL,
-            Constants.DOMAIN_LEGAL: cls.LEGAL,
-            Constants.DOMAIN_TECHNICAL: cls.TECHNICAL
-        }
+        return dict(cls._template_map())
     
     @classmethod
     def get_template(cls, domain: str) -> str:
@@ -109,5 +124,4 @@ class PromptTemplates:
         Returns:
             Prompt template string
         """
-        templates = cls.get_templates()
-        return templates.get(domain, cls.GENERAL) 
\ No newline at end of file
+        return cls._template_map().get(domain, cls.GENERAL)
@@ -6,12 +6,17 @@ import time
 import random
 import logging
 import re
-from typing import List, Optional
+import threading
+from collections import deque
+from typing import Deque, Optional
 
 from src.config.app_config import AppConfig
 
 logger = logging.getLogger(__name__)
 
+# Retry delay embedded in Gemini quota errors
+_RETRY_DELAY_RE = re.compile(r'retry_delay\s*{\s*seconds:\s*(\d+)\s*}')
+
 
 class RateLimiter:
     """
@@ -34,18 +39,28 @@ class RateLimiter:
         self.requests_per_minute = requests_per_minute or config.get('requests_per_minute')
         self.max_retries = max_retries or config.get('max_retries')
         self.base_delay = base_delay or config.get('base_delay')
-        self.request_timestamps: List[float] = []
+        self.request_timestamps: Deque[float] = deque()
+        self._lock = threading.Lock()
         
         logger.debug(f"Rate limiter initialized with {self.requests_per_minute} requests per minute")
     
-    def wait_if_needed(self) -> None:
+    def _time_until_capacity(self) -> float:
         """
-        Wait if necessary to respect rate limits.
-        Removes timestamps older than 1 minute and waits if approaching rate limit.
+        Evict expired timestamps and compute how long to wait for capacity.
+        Must be called with the lock held.
+        
+        Returns:
+            Seconds to wait, 0 if a request may be made now
         """
-        # Remove timestamps older than 1 minute
-        current_time = time.time()
-        self.request_timestamps = [ts for ts in self.request_timestamps if current_time - ts < 60]
+        # Expiring entries only shrinks the window, so well under the limit
+        # there is nothing to evict or wait for
+        if len(self.request_timestamps) < self.requests_per_minute - 1:
+            return 0
+        
+        # Remove timestamps older than 1 minute (oldest are on the left)
+        current_time = time.monotonic()
+        while self.request_timestamps and current_time - self.request_timestamps[0] >= 60:
+            self.request_timestamps.popleft()
         
         # If we're at or near the rate limit, wait until we have capacity
         if len(self.request_timestamps) >= self.requests_per_minute - 1:
@@ -54,15 +69,51 @@ class RateLimiter:
             wait_time = 60 - (current_time - oldest_timestamp) + 1  # Add 1 second buffer
             
             # Ensure wait time is reasonable
-            wait_time = max(0, min(wait_time, 60))
+            return max(0, min(wait_time, 60))
+        
+        return 0
+    
+    def wait_if_needed(self) -> float:
+        """
+        Wait if necessary to respect rate limits, then reserve a request slot.
+        Removes timestamps older than 1 minute and waits if approaching rate limit.
+        The capacity check and the reservation happen under one lock acquisition,
+        so concurrent callers cannot all pass the check before any of them is
+        counted; the sleep happens outside the lock.
+        
+        Returns:
+            Timestamp of the reserved slot, for release_request
+        """
+        while True:
+            with self._lock:
+                wait_time = self._time_until_capacity()
+                if wait_time <= 0:
+                    timestamp = time.monotonic()
+                    self.request_timestamps.append(timestamp)
+                    return timestamp
             
-            if wait_time > 0:
-                logger.info(f"Rate limit approaching, waiting {wait_time:.2f} seconds")
-                time.sleep(wait_time)
-                
+            logger.info(f"Rate limit approaching, waiting {wait_time:.2f} seconds")
+            time.sleep(wait_time)
+    
     def record_request(self) -> None:
-        """Record that a request was made."""
-        self.request_timestamps.append(time.time())
+        """Record that a request was made without reserving it through wait_if_needed."""
+        with self._lock:
+            self.request_timestamps.append(time.monotonic())
+    
+    def release_request(self, timestamp: float) -> None:
+        """
+        Give back a slot reserved by wait_if_needed for a request that never
+        reached the API.
+        
+        Args:
+            timestamp: Timestamp returned by wait_if_needed
+        """
+        with self._lock:
+            try:
+                self.request_timestamps.remove(timestamp)
+            except ValueError:
+                # Already expired out of the window
+                pass
         
     def extract_retry_delay(self, error_message: str) -> int:
         """
@@ -75,28 +126,31 @@ class RateLimiter:
             Retry delay in seconds, default 60 if not found
         """
         # Try to find retry_delay in the error message
-        match = re.search(r'retry_delay\s*{\s*seconds:\s*(\d+)\s*}', error_message)
+        match = _RETRY_DELAY_RE.search(error_message)
         if match:
             return int(match.group(1))
         return 60  # Default delay if not found
         
-    def get_retry_delay(self, attempt: int) -> float:
+    def get_retry_delay(self, attempt: int, previous_delay: Optional[float] = None,
+                        base_delay: Optional[float] = None) -> float:
         """
-        Calculate delay for retry with exponential backoff and jitter.
+        Calculate delay for retry with decorrelated jitter backoff.
+        Each delay is drawn between the base delay and three times the previous
+        delay, so concurrent retries spread out instead of colliding.
         
         Args:
             attempt: Current retry attempt number (1-based)
+            previous_delay: Delay used before the previous attempt, if any
+            base_delay: Minimum delay, defaults to the configured base delay
             
         Returns:
             Delay in seconds
         """
-        # Exponential backoff with base delay
-        delay = self.base_delay * (2 ** (attempt - 1))
-        
-        # Add random jitter (0-30% of delay)
-        jitter = delay * random.uniform(0, 0.3)
+        base = base_delay or self.base_delay
         
-        # Apply jitter and limit to reasonable max
-        final_delay = min(delay + jitter, 60)
+        # The first retry has no previous delay to grow from
+        if attempt <= 1 or not previous_delay:
+            previous_delay = base
         
-        return final_delay 
\ No newline at end of file
+        # Limit to a reasonable max
+        return min(random.uniform(base, previous_delay * 3), 60)
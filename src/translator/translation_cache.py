@@ -0,0 +1,181 @@
+"""
+Persistent cache for translated text.
+"""
+
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Words split across lines by PDF extraction ("trans- lation")
+_HYPHEN_BREAK_RE = re.compile(r'(\w)-\s+(\w)')
+# Bumped whenever normalize changes, so near-match keys built the old way are dropped
+_NEAR_KEY_VERSION = 1
+
+
+class TranslationCache:
+    """
+    SQLite-backed exact-match cache of translations.
+    Entries are keyed by a hash of the domain, model name and cleaned source text.
+    A second table keyed on a normalized form of the text catches near-duplicates
+    that differ only in spacing or hyphenated line breaks. Case and punctuation
+    are kept, since "US" and "us" or "Done?" and "Done." translate differently.
+    """
+
+    def __init__(self, path: str, ttl_seconds: Optional[float] = None):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path: Path to the SQLite database file
+            ttl_seconds: Drop entries older than this on open; None keeps everything
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT, ts REAL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS near_cache (key TEXT PRIMARY KEY, value TEXT, ts REAL)"
+        )
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] < _NEAR_KEY_VERSION:
+            self._conn.execute("DELETE FROM near_cache")
+            self._conn.execute(f"PRAGMA user_version = {_NEAR_KEY_VERSION}")
+        self._conn.commit()
+
+        if ttl_seconds:
+            self.expire(ttl_seconds)
+
+        logger.debug(f"Translation cache opened at {path}")
+
+    @staticmethod
+    def make_key(domain: str, model_name: str, text: str) -> str:
+        """
+        Build the cache key for a piece of text.
+
+        Args:
+            domain: Translation domain
+            model_name: Name of the model producing the translation
+            text: Cleaned source text
+
+        Returns:
+            Hex digest identifying the translation
+        """
+        return hashlib.sha1(f"{domain}|{model_name}|{text}".encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        Reduce text to the form used for near-match lookups.
+
+        Args:
+            text: Cleaned source text
+
+        Returns:
+            Text with hyphenated line breaks joined and whitespace collapsed
+        """
+        text = _HYPHEN_BREAK_RE.sub(r'\1\2', text)
+        return ' '.join(text.split())
+
+    @classmethod
+    def make_near_key(cls, domain: str, model_name: str, text: str) -> str:
+        """
+        Build the near-match cache key for a piece of text.
+
+        Args:
+            domain: Translation domain
+            model_name: Name of the model producing the translation
+            text: Cleaned source text
+
+        Returns:
+            Hex digest identifying the normalized text
+        """
+        return cls.make_key(domain, model_name, cls.normalize(text))
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached translation.
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            Cached translation, or None on a miss
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def get_near(self, near_key: str) -> Optional[str]:
+        """
+        Look up a translation of a near-duplicate text.
+
+        Args:
+            near_key: Cache key from make_near_key
+
+        Returns:
+            Cached translation, or None on a miss
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM near_cache WHERE key = ?", (near_key,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, value: str, near_key: Optional[str] = None) -> None:
+        """
+        Store a translation.
+
+        Args:
+            key: Cache key from make_key
+            value: Translated text
+            near_key: Optional cache key from make_near_key
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, ts) VALUES (?, ?, ?)",
+                (key, value, now)
+            )
+            if near_key is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO near_cache (key, value, ts) VALUES (?, ?, ?)",
+                    (near_key, value, now)
+                )
+            self._conn.commit()
+
+    def expire(self, ttl_seconds: float) -> int:
+        """
+        Delete entries older than the given age.
+
+        Args:
+            ttl_seconds: Maximum entry age in seconds
+
+        Returns:
+            Number of exact-match entries removed
+        """
+        cutoff = time.time() - ttl_seconds
+        with self._lock:
+            removed = self._conn.execute("DELETE FROM cache WHERE ts < ?", (cutoff,)).rowcount
+            self._conn.execute("DELETE FROM near_cache WHERE ts < ?", (cutoff,))
+            self._conn.commit()
+        if removed:
+            logger.info(f"Expired {removed} cached translations")
+        return removed
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
@@ -4,7 +4,10 @@ Module for translating text using the Gemini API.
 
 import logging
 import re
-from typing import List, Optional, Dict, Any
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Dict, Any, Tuple
 import google.generativeai as genai
 
 from src.config.app_config import AppConfig
@@ -12,18 +15,41 @@ from src.config.constants import Constants
 from src.translator.prompt_templates import PromptTemplates
 from src.translator.rate_limiter import RateLimiter
 from src.translator.error_handler import ErrorHandler, TranslationError
+from src.translator.translation_cache import TranslationCache
 from src.models.text_element import TextElement
 from src.utils.rtl_handler import RTLHandler
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Runs of anything other than Persian characters, whitespace and Persian punctuation
+_NON_PERSIAN_RE = re.compile(r'[^\u0600-\u06FF\s،؛؟]+')
+
+# Fragments not worth a request: numbers, punctuation, URLs and DOIs
+_NON_TRANSLATABLE_RE = re.compile(r'^(?:[\W\d_]+|(?:https?://|www\.)\S+|(?:doi:\s*)?10\.\d{4,}/\S+)$', re.IGNORECASE)
+
+# Prefix of the placeholder returned by translate_text when a translation fails
+_TRANSLATION_ERROR_PREFIX = "[Translation error:"
+
+# Packed prompts: segments are numbered [[i]] and the model echoes the markers back
+_SEGMENT_SEPARATOR = "\n---\n"
+# Markers may come back spaced out or in Persian digits; \d and int() accept both
+_SEGMENT_RE = re.compile(r'\[\[\s*(\d+)\s*\]\]\s*(.*?)(?=\[\[\s*\d+\s*\]\]|\Z)', re.DOTALL)
+_GROUP_INSTRUCTION = ("\n\nThe text above consists of numbered segments separated by ---. "
+                      "Translate each segment separately and return every translation "
+                      "prefixed by its marker, for example [[0]].")
+_MAX_GROUP_SIZE = 20
+
 
 class GeminiTranslator:
     """
     Translates text from English to Persian using the Google Gemini API.
     """
     
+    # Loaded models shared by all instances, keyed by (api key, model, fallback model)
+    _models: Dict[Tuple[str, str, str], Tuple[Any, str]] = {}
+    _model_lock = threading.Lock()
+    
     def __init__(self, domain: str = None):
         """
         Initialize the translator with API key from configuration.
@@ -42,6 +68,13 @@ class GeminiTranslator:
             
         logger.info(f"Using {self.domain} domain for translations")
         
+        # The domain is fixed for this translator, so resolve its template once and
+        # split it around the {text} placeholder to build prompts by concatenation
+        self._prompt_template = PromptTemplates.get_template(self.domain)
+        prefix, _, suffix = self._prompt_template.partition('{text}')
+        self._prompt_prefix = prefix
+        self._prompt_suffix = suffix
+        
         # Create rate limiter
         self.rate_limiter = RateLimiter()
         
@@ -51,6 +84,20 @@ class GeminiTranslator:
         # Initialize the API
         self._initialize_api()
         
+        # Recent translations made by this instance, keyed by source text, so repeated
+        # batches skip even the cache lookup; least recently used entries are dropped
+        # once it holds TRANSLATION_MEMO_SIZE texts, the persistent cache keeps the rest
+        self._memo: "OrderedDict[str, str]" = OrderedDict()
+        
+        # Open the persistent translation cache
+        self.cache = None
+        if self.config.get('use_cache', True):
+            try:
+                ttl_days = self.config.get('cache_ttl_days', 0)
+                self.cache = TranslationCache(self.config.get('cache_path'), ttl_days * 86400 or None)
+            except Exception as e:
+                logger.warning(f"Could not open translation cache: {str(e)}")
+        
     def _initialize_api(self) -> None:
         """Initialize the Google Generative AI API with available models."""
         # Get API key from configuration
@@ -60,28 +107,51 @@ class GeminiTranslator:
             logger.error("No API key found. Please set GEMINI_API_KEY in .env file")
             raise ValueError("Missing API key")
         
+        # Get model name from configuration
+        model_name = self.config.get_model_name()
+        fallback_model = self.config.get_fallback_model()
+        
+        # Reuse the model loaded by an earlier translator with the same settings
+        cache_key = (api_key, model_name, fallback_model)
+        with GeminiTranslator._model_lock:
+            cached = GeminiTranslator._models.get(cache_key)
+            if cached is None:
+                cached = GeminiTranslator._models[cache_key] = self._load_model(api_key, model_name, fallback_model)
+        self.model, self.model_name = cached
+        
+    @staticmethod
+    def _load_model(api_key: str, model_name: str, fallback_model: str) -> Tuple[Any, str]:
+        """
+        Configure the API and load the primary model, or the fallback model.
+        
+        Args:
+            api_key: Gemini API key
+            model_name: Preferred model name
+            fallback_model: Model name to use if the preferred one fails
+            
+        Returns:
+            Tuple of (model, name of the loaded model)
+        """
         # Log key info for debugging (safely)
         logger.info(f"API Key found. Length: {len(api_key)}, First 4 chars: {api_key[:4]}...")
         
         # Configure the Gemini API
         genai.configure(api_key=api_key)
         
-        # Get model name from configuration
-        model_name = self.config.get_model_name()
-        fallback_model = self.config.get_fallback_model()
-        
         # Try to load the primary model
         try:
-            self.model = genai.GenerativeModel(model_name)
+            model = genai.GenerativeModel(model_name)
             logger.info(f"Using {model_name} model")
+            return model, model_name
         except Exception as e:
             logger.warning(f"Could not load {model_name} model: {str(e)}")
             
             # Try fallback model
             try:
                 logger.info(f"Trying fallback model: {fallback_model}")
-                self.model = genai.GenerativeModel(fallback_model)
+                model = genai.GenerativeModel(fallback_model)
                 logger.info(f"Using fallback model: {fallback_model}")
+                return model, fallback_model
             except Exception as e:
                 logger.error(f"Could not load fallback model: {str(e)}")
                 raise ValueError("Could not load any model")
@@ -93,28 +163,94 @@ class GeminiTranslator:
         Returns:
             Prompt template string
         """
-        return PromptTemplates.get_template(self.domain)
+        return self._prompt_template
         
-    def translate_text(self, text: str) -> str:
+    def _prepare_translation(self, text: str) -> Tuple[Optional[str], str, Optional[str], Optional[str]]:
         """
-        Translate text from English to Persian using Gemini API.
+        Clean text and try to resolve it from the cache.
         
         Args:
             text: The text to translate
             
         Returns:
-            Translated text in Persian
+            Tuple of (final result or None, cleaned text, cache key, near-match cache key).
+            When the first item is not None no API call is needed.
         """
         if not text or text.isspace():
-            return ""
+            return "", "", None, None
             
         # Clean the text
         cleaned_text = RTLHandler.clean_text_for_translation(text)
         if not cleaned_text:
-            return ""
+            return "", "", None, None
             
-        # Get prompt template and format with text
-        prompt = self._get_prompt_template().format(text=cleaned_text)
+        # Keep extraction artifacts and untranslatable fragments as they are
+        if len(cleaned_text) < Constants.MIN_TRANSLATE_LENGTH or _NON_TRANSLATABLE_RE.match(cleaned_text):
+            return cleaned_text, "", None, None
+            
+        # Return a previous translation of the same text if we have one
+        cache_key = near_key = None
+        if self.cache is not None:
+            cache_key = TranslationCache.make_key(self.domain, self.model_name, cleaned_text)
+            cached = self.cache.get(cache_key)
+            if cached is None and self.config.get('near_match_cache', True):
+                near_key = TranslationCache.make_near_key(self.domain, self.model_name, cleaned_text)
+                cached = self.cache.get_near(near_key)
+            if cached is not None:
+                logger.debug(f"Cache hit for '{text[:30]}...'")
+                return cached, "", None, None
+            
+        return None, cleaned_text, cache_key, near_key
+        
+    def _build_prompt(self, cleaned_text: str) -> str:
+        """
+        Insert text into the domain's prompt template.
+        
+        Args:
+            cleaned_text: Cleaned text to translate
+            
+        Returns:
+            Prompt string
+        """
+        return self._prompt_prefix + cleaned_text + self._prompt_suffix
+        
+    def _finish_translation(self, text: str, translated_text: str,
+                            cache_key: Optional[str], near_key: Optional[str]) -> str:
+        """
+        Clean an API response and store it in the cache.
+        
+        Args:
+            text: The original text
+            translated_text: Raw response text from the API
+            cache_key: Cache key from _prepare_translation
+            near_key: Near-match cache key from _prepare_translation
+            
+        Returns:
+            Cleaned translation
+        """
+        # Clean up the response
+        cleaned_response = self._clean_response(translated_text)
+        
+        if cache_key is not None and cleaned_response:
+            self.cache.put(cache_key, cleaned_response, near_key)
+        
+        logger.debug(f"Translated: '{text[:30]}...' -> '{cleaned_response[:30]}...'")
+        return cleaned_response
+        
+    def translate_text(self, text: str) -> str:
+        """
+        Translate text from English to Persian using Gemini API.
+        
+        Args:
+            text: The text to translate
+            
+        Returns:
+            Translated text in Persian
+        """
+        result, cleaned_text, cache_key, near_key = self._prepare_translation(text)
+        if result is not None:
+            return result
+        prompt = self._build_prompt(cleaned_text)
         
         # Define the translation function
         def perform_translation():
@@ -124,16 +260,11 @@ class GeminiTranslator:
         try:
             # Use error handler to manage retries and rate limits
             translated_text = self.error_handler.handle_with_retry(perform_translation)
-            
-            # Clean up the response
-            cleaned_response = self._clean_response(translated_text)
-            
-            logger.debug(f"Translated: '{text[:30]}...' -> '{cleaned_response[:30]}...'")
-            return cleaned_response
+            return self._finish_translation(text, translated_text, cache_key, near_key)
             
         except TranslationError as e:
             logger.error(f"Translation error: {str(e)}")
-            return f"[Translation error: {str(e)}]"
+            return f"{_TRANSLATION_ERROR_PREFIX} {str(e)}]"
     
     def _clean_response(self, response: str) -> str:
         """
@@ -149,24 +280,23 @@ class GeminiTranslator:
             return ""
             
         # Remove any explanatory text that might have been added
-        # First, try to extract just the Persian text
-        persian_pattern = re.compile(r'[\u0600-\u06FF\s،؛؟]+')
-        persian_matches = persian_pattern.findall(response)
+        # First, try to keep just the Persian text, replacing every other run with a space
+        persian_text, replaced = _NON_PERSIAN_RE.subn(' ', response)
         
-        if persian_matches:
-            # Join all Persian text segments
-            return ' '.join(persian_matches).strip()
+        # A single replacement that left one space means nothing matched the Persian class
+        if replaced == 1 and persian_text == ' ':
+            # If no Persian text found, return the cleaned response
+            return response.strip()
             
-        # If no Persian text found, return the cleaned response
-        return response.strip()
+        return persian_text.strip()
         
     def batch_translate(self, texts: List[str], batch_size: int = None) -> List[str]:
         """
-        Translate multiple texts in batches.
+        Translate multiple texts concurrently.
         
         Args:
             texts: List of texts to translate
-            batch_size: Number of texts per batch
+            batch_size: Number of requests between progress log entries
             
         Returns:
             List of translated texts
@@ -178,25 +308,138 @@ class GeminiTranslator:
         if batch_size is None:
             batch_size = self.config.get('batch_size', Constants.DEFAULT_BATCH_SIZE)
             
-        logger.info(f"Translating {len(texts)} texts in batches of {batch_size}")
+        # Translate each distinct text once (repeated headers, footers, captions),
+        # skipping texts this translator has already translated
+        memo = self._memo
+        translations = {}
+        unique_texts = []
+        for text in dict.fromkeys(texts):
+            if text in memo:
+                memo.move_to_end(text)
+                translations[text] = memo[text]
+            else:
+                unique_texts.append(text)
+        
+        max_workers = self.config.get('translate_concurrency', Constants.DEFAULT_TRANSLATE_CONCURRENCY)
+        logger.info(f"Translating {len(unique_texts)} unique of {len(texts)} texts "
+                    f"with {max_workers} concurrent requests")
+        
+        # Pack short texts together so one request translates several of them
+        groups = self._pack_texts(unique_texts)
+        
+        new_translations = {}
+        # Requests are network-bound, so threads overlap their round-trips while
+        # the shared rate limiter keeps the overall request rate in budget. All
+        # groups are submitted at once so every worker stays busy
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(self._translate_group, groups)
+            for done, (group, group_results) in enumerate(zip(groups, results), 1):
+                new_translations.update(zip(group, group_results))
+                
+                # Log progress
+                if done % batch_size == 0 or done == len(groups):
+                    logger.info(f"Translated {done}/{len(groups)} requests")
+            
+        self._remember(new_translations)
+        translations.update(new_translations)
+        
+        # Scatter the translations back into input order
+        return [translations[text] for text in texts]
+        
+    def _remember(self, translations: Dict[str, str]) -> None:
+        """
+        Keep successful translations in the in-memory memo.
+        
+        Args:
+            translations: Mapping of source text to translation
+        """
+        memo = self._memo
+        for text, translated in translations.items():
+            if translated and not translated.startswith(_TRANSLATION_ERROR_PREFIX):
+                memo[text] = translated
+                memo.move_to_end(text)
+        
+        # Drop the least recently used entries beyond the size limit
+        while len(memo) > Constants.TRANSLATION_MEMO_SIZE:
+            memo.popitem(last=False)
+        
+    def _pack_texts(self, texts: List[str]) -> List[List[str]]:
+        """
+        Split texts into groups small enough to share one prompt.
+        
+        Args:
+            texts: List of texts to translate
+            
+        Returns:
+            List of groups, in input order
+        """
+        max_chars = self.config.get('pack_chars', Constants.DEFAULT_PACK_CHARS)
+        if max_chars <= 0:
+            return [[text] for text in texts]
+            
+        groups = []
+        group = []
+        group_chars = 0
+        for text in texts:
+            if group and (group_chars + len(text) > max_chars or len(group) >= _MAX_GROUP_SIZE):
+                groups.append(group)
+                group = []
+                group_chars = 0
+            group.append(text)
+            group_chars += len(text)
+        if group:
+            groups.append(group)
+            
+        return groups
+        
+    def _translate_group(self, texts: List[str]) -> List[str]:
+        """
+        Translate a group of texts with a single packed request.
+        Texts missing from the model's reply are translated individually.
         
-        results = []
-        for i in range(0, len(texts), batch_size):
-            # Get batch
-            batch = texts[i:i+batch_size]
+        Args:
+            texts: Texts to translate together
             
-            # Translate each text in batch
-            batch_results = []
-            for text in batch:
-                translated = self.translate_text(text)
-                batch_results.append(translated)
+        Returns:
+            List of translated texts, in input order
+        """
+        if len(texts) == 1:
+            return [self.translate_text(texts[0])]
+            
+        results: List[Optional[str]] = []
+        pending = []
+        for i, text in enumerate(texts):
+            result, cleaned_text, cache_key, near_key = self._prepare_translation(text)
+            results.append(result)
+            if result is None:
+                pending.append((i, cleaned_text, cache_key, near_key))
                 
-            # Extend results
-            results.extend(batch_results)
+        if len(pending) == 1:
+            i = pending[0][0]
+            results[i] = self.translate_text(texts[i])
+            return results
             
-            # Log progress
-            logger.info(f"Translated batch {i//batch_size + 1}/{(len(texts) + batch_size - 1)//batch_size}")
+        if pending:
+            packed = _SEGMENT_SEPARATOR.join(f"[[{n}]] {item[1]}" for n, item in enumerate(pending))
+            prompt = self._build_prompt(packed) + _GROUP_INSTRUCTION
             
+            def perform_translation():
+                response = self.model.generate_content(prompt)
+                return response.text
+                
+            try:
+                response = self.error_handler.handle_with_retry(perform_translation)
+                segments = {int(n): part for n, part in _SEGMENT_RE.findall(response or "")}
+            except TranslationError as e:
+                logger.warning(f"Packed translation failed, translating texts individually: {str(e)}")
+                segments = {}
+                
+            for n, (i, _, cache_key, near_key) in enumerate(pending):
+                part = segments.get(n)
+                translated = self._finish_translation(texts[i], part, cache_key, near_key) if part else ""
+                # Fall back to a single request for anything the reply did not cover
+                results[i] = translated or self.translate_text(texts[i])
+                
         return results
         
     def translate_elements(self, elements: List[TextElement], 
@@ -207,7 +450,7 @@ class GeminiTranslator:
         
         Args:
             elements: List of TextElement objects
-            batch_size: Number of elements per batch
+            batch_size: Number of requests between progress log entries
             continue_on_error: Whether to continue if errors occur
             
         Returns:
@@ -220,9 +463,15 @@ class GeminiTranslator:
             # Translate texts
             translated_texts = self.batch_translate(texts, batch_size)
             
-            # Update elements with translations
+            # Update elements with translations. Failed or empty translations, and
+            # fragments passed through unchanged (numbers, URLs, DOIs), are not marked
+            # complete, so the original glyphs stay on the page for them
             for element, translated_text in zip(elements, translated_texts):
-                element.set_translated_text(translated_text)  # Use the correct method
+                element.translated_text = translated_text
+                element.is_rtl = None
+                element.is_complete = (bool(translated_text)
+                                       and not translated_text.startswith(_TRANSLATION_ERROR_PREFIX)
+                                       and translated_text != RTLHandler.clean_text_for_translation(element.text))
                 
         except Exception as e:
             logger.error(f"Error in batch translation: {str(e)}")
@@ -230,9 +479,11 @@ class GeminiTranslator:
             if not continue_on_error:
                 raise
                 
-            # If continuing on error, mark all untranslated elements
+            # If continuing on error, mark all untranslated elements; they stay
+            # incomplete so the original text is kept on the page
             for element in elements:
                 if not element.translated_text:
                     element.set_translated_text(f"[Translation error: {str(e)}]")
+                    element.is_complete = False
         
         return elements 
\ No newline at end of file
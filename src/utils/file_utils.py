@@ -3,7 +3,6 @@ File and directory utilities for the application.
 """
 
 import os
-import glob
 import logging
 from pathlib import Path
 from typing import List, Optional
@@ -12,6 +11,9 @@ from src.config.constants import Constants
 
 logger = logging.getLogger(__name__)
 
+# Lower-cased file name suffix matched by find_pdf_files
+_PDF_SUFFIX = Constants.PDF_EXTENSION.lower()
+
 class FileUtils:
     """Utility functions for file operations."""
     
@@ -32,15 +34,15 @@ class FileUtils:
         # If no directory provided, check default locations
         if directory is None:
             # First check samples directory
-            if os.path.exists(Constants.SAMPLES_DIR) and os.path.isdir(Constants.SAMPLES_DIR):
-                pdf_files.extend(glob.glob(f"{Constants.SAMPLES_DIR}/*.pdf"))
+            if os.path.isdir(Constants.SAMPLES_DIR):
+                pdf_files.extend(FileUtils._scan_pdf_files(Constants.SAMPLES_DIR))
             
             # Then check current directory
-            pdf_files.extend(glob.glob(f"*.{Constants.PDF_EXTENSION}"))
+            pdf_files.extend(FileUtils._scan_pdf_files(None))
         else:
             # Use the provided directory
             if os.path.exists(directory):
-                pdf_files.extend(glob.glob(f"{directory}/*.{Constants.PDF_EXTENSION}"))
+                pdf_files.extend(FileUtils._scan_pdf_files(directory))
             else:
                 logger.warning(f"Directory not found: {directory}")
         
@@ -54,6 +56,28 @@ class FileUtils:
             
         return pdf_files
         
+    @staticmethod
+    def _scan_pdf_files(directory: Optional[str]) -> List[str]:
+        """
+        List the PDF files directly inside a directory with a single scandir pass.
+        
+        Args:
+            directory: Directory to scan, or None for the current directory
+            
+        Returns:
+            List of paths to PDF files (bare file names for the current directory)
+        """
+        try:
+            with os.scandir(directory or '.') as entries:
+                return [
+                    entry.name if directory is None else entry.path
+                    for entry in entries
+                    if entry.name.lower().endswith(_PDF_SUFFIX) and entry.is_file()
+                ]
+        except OSError as e:
+            logger.warning(f"Could not scan directory {directory or '.'}: {str(e)}")
+            return []
+        
     @staticmethod
     def ensure_directory_exists(directory_path: str) -> str:
         """
@@ -4,8 +4,10 @@ Utility functions for font handling and text rendering.
 
 import os
 import logging
+import functools
 import tempfile
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional, Tuple
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
@@ -23,11 +25,30 @@ DEFAULT_PERSIAN_FONTS = {
     'Tanha': 'Tanha.ttf'
 }
 
+# Project fonts directory, resolved once at import
+PROJECT_FONTS_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'fonts'))
 
+# Directories searched for font files, in order of preference
+FONT_SEARCH_DIRS = (
+    PROJECT_FONTS_DIR,  # Project fonts directory
+    os.path.join(os.path.expanduser('~'), '.fonts'),  # User fonts directory
+    '/usr/share/fonts/truetype',  # Linux system fonts
+    '/System/Library/Fonts',  # macOS system fonts
+    'C:\\Windows\\Fonts'  # Windows system fonts
+)
+
+# Per-font glyph advances at 1pt, filled lazily as new characters are seen
+_glyph_advances: Dict[str, Dict[str, float]] = {}
+
+
+@functools.lru_cache(maxsize=None)
 def register_persian_fonts() -> str:
     """
     Register Persian fonts for use with ReportLab.
     
+    The result is cached, so the font directories are only searched once per
+    process; download_persian_fonts clears it when new fonts arrive.
+    
     Returns:
         Name of the default Persian font that was registered
     """
@@ -36,38 +57,39 @@ def register_persian_fonts() -> str:
     registered_fonts = []
     
     try:
-        # Look for fonts in common locations
-        font_dirs = [
-            os.path.join(os.path.dirname(__file__), '..', '..', 'fonts'),  # Project fonts directory
-            os.path.join(os.path.expanduser('~'), '.fonts'),  # User fonts directory
-            '/usr/share/fonts/truetype',  # Linux system fonts
-            '/System/Library/Fonts',  # macOS system fonts
-            'C:\\Windows\\Fonts'  # Windows system fonts
-        ]
+        # Fonts registered by an earlier call need no second TTF parse
+        already_registered = set(pdfmetrics.getRegisteredFontNames())
+        
+        # List each existing font directory once, and only if something is
+        # left to register; the first directory holding a file wins
+        present_files = {}
+        if not already_registered.issuperset(DEFAULT_PERSIAN_FONTS):
+            for font_dir in FONT_SEARCH_DIRS:
+                try:
+                    with os.scandir(font_dir) as entries:
+                        for entry in entries:
+                            present_files.setdefault(entry.name, entry.path)
+                except OSError:
+                    continue
         
         # Try to find and register each font
         for font_name, font_file in DEFAULT_PERSIAN_FONTS.items():
-            registered = False
-            
-            for font_dir in font_dirs:
-                if not os.path.exists(font_dir):
-                    continue
-                    
-                # Look for the font file
-                font_path = os.path.join(font_dir, font_file)
-                if os.path.exists(font_path):
-                    try:
-                        # Register the font with ReportLab
-                        pdfmetrics.registerFont(TTFont(font_name, font_path))
-                        registered_fonts.append(font_name)
-                        registered = True
-                        logger.info(f"Registered font: {font_name} from {font_path}")
-                        break
-                    except Exception as e:
-                        logger.warning(f"Failed to register font {font_name}: {str(e)}")
-            
-            if not registered:
+            if font_name in already_registered:
+                registered_fonts.append(font_name)
+                continue
+                
+            font_path = present_files.get(font_file)
+            if font_path is None:
                 logger.warning(f"Could not find font file for {font_name}")
+                continue
+                
+            try:
+                # Register the font with ReportLab
+                pdfmetrics.registerFont(TTFont(font_name, font_path))
+                registered_fonts.append(font_name)
+                logger.info(f"Registered font: {font_name} from {font_path}")
+            except Exception as e:
+                logger.warning(f"Failed to register font {font_name}: {str(e)}")
         
         # If no fonts were registered, use a fallback approach
         if not registered_fonts:
@@ -134,7 +156,7 @@ def download_persian_fonts(target_dir: Optional[str] = None) -> bool:
     
     # Determine target directory
     if target_dir is None:
-        target_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'fonts')
+        target_dir = PROJECT_FONTS_DIR
     
     # Create directory if it doesn't exist
     if not os.path.exists(target_dir):
@@ -144,32 +166,51 @@ def download_persian_fonts(target_dir: Optional[str] = None) -> bool:
             logger.error(f"Failed to create fonts directory: {str(e)}")
             return False
     
-    success = True
-    
-    # Download each font
-    for font_file, url in font_urls.items():
+    def download_font(item: Tuple[str, str]) -> bool:
+        font_file, url = item
         target_path = os.path.join(target_dir, font_file)
         
         # Skip if font already exists
         if os.path.exists(target_path):
             logger.info(f"Font already exists: {font_file}")
-            continue
+            return True
         
         try:
             logger.info(f"Downloading font: {font_file}")
-            response = requests.get(url, stream=True)
+            response = session.get(url, stream=True)
             response.raise_for_status()
             
+            # Copy the raw stream in 1 MB blocks; decode_content undoes any
+            # transfer compression the way iter_content would
+            response.raw.decode_content = True
             with open(target_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+                shutil.copyfileobj(response.raw, f, length=1 << 20)
                     
             logger.info(f"Downloaded font: {font_file}")
+            return True
         except Exception as e:
             logger.error(f"Failed to download font {font_file}: {str(e)}")
-            success = False
+            return False
+    
+    # Download the fonts concurrently over one pooled session, so the
+    # connection to the font host is reused and transfers overlap
+    with requests.Session() as session:
+        with ThreadPoolExecutor(max_workers=len(font_urls)) as executor:
+            results = list(executor.map(download_font, font_urls.items()))
     
-    return success
+    # Let the next registration pick up the new files
+    register_persian_fonts.cache_clear()
+    
+    return all(results)
+
+
+@functools.lru_cache(maxsize=65536)
+def _string_width(text: str, font_name: str, font_size: float) -> float:
+    """
+    Cached pdfmetrics.stringWidth. Failures raise and are therefore never
+    cached, so only widths measured with real font metrics are remembered.
+    """
+    return pdfmetrics.stringWidth(text, font_name, font_size)
 
 
 def get_text_width(text: str, font_name: str, font_size: float) -> float:
@@ -185,34 +226,30 @@ def get_text_width(text: str, font_name: str, font_size: float) -> float:
         Width of the text in points
     """
     try:
-        # Get the font
-        font = pdfmetrics.getFont(font_name)
-        
         # Method 1: Try using stringWidth from pdfmetrics (most reliable)
         try:
-            width = pdfmetrics.stringWidth(text, font_name, font_size)
-            return width
+            return _string_width(text, font_name, font_size)
         except Exception:
             pass
             
+        # Get the font
+        font = pdfmetrics.getFont(font_name)
+        
         # Method 2: Try using face.getCharWidth
         try:
             face = font.face
-            width = 0
-            for char in text:
-                if hasattr(face, 'getCharWidth'):
-                    width += face.getCharWidth(ord(char)) / 1000 * font_size
-                else:
-                    # Use a fallback if getCharWidth is not available
-                    # This is a common issue with some font types
-                    width += 0.6 * font_size  # Rough estimate for character width
-            return width
+            if hasattr(face, 'getCharWidth'):
+                # map() drives the per-character lookups from C
+                return sum(map(face.getCharWidth, map(ord, text))) / 1000 * font_size
+            # Use a fallback if getCharWidth is not available
+            # This is a common issue with some font types
+            return len(text) * 0.6 * font_size  # Rough estimate for character width
         except Exception:
             pass
             
         # Method 3: Fallback to a rough estimate based on average character width
         # For Persian text, usually need more space
-        if any(ord(c) > 127 for c in text):  # Non-ASCII characters
+        if not text.isascii():  # Non-ASCII characters
             return len(text) * font_size * 0.7  # Persian/Arabic characters
         else:
             return len(text) * font_size * 0.6  # ASCII characters
@@ -220,4 +257,79 @@ def get_text_width(text: str, font_name: str, font_size: float) -> float:
     except Exception as e:
         logger.warning(f"Error calculating text width: {str(e)}")
         # Final fallback
-        return len(text) * font_size * 0.65 
\ No newline at end of file
+        return len(text) * font_size * 0.65
+
+
+def get_glyph_advances(text: str, font_name: str) -> List[float]:
+    """
+    Get the advance width at 1pt of each character in text.
+    
+    Advances are looked up in a per-font table that is filled on first use of
+    each character, so repeated measurements never hit the font metrics again.
+    
+    Args:
+        text: Text whose characters to measure
+        font_name: Font name
+        
+    Returns:
+        List of advance widths, one per character
+    """
+    advances = _glyph_advances.get(font_name)
+    if advances is None:
+        advances = _glyph_advances[font_name] = {}
+    
+    # Once every character has been seen the whole lookup runs from C
+    try:
+        return list(map(advances.__getitem__, text))
+    except KeyError:
+        pass
+    
+    result = []
+    for char in text:
+        advance = advances.get(char)
+        if advance is None:
+            advance = advances[char] = get_text_width(char, font_name, 1.0)
+        result.append(advance)
+    return result
+
+
+@functools.lru_cache(maxsize=None)
+def get_max_glyph_advance(font_name: str) -> float:
+    """
+    Get an upper bound on the advance width at 1pt of any glyph in a font.
+    
+    Args:
+        font_name: Font name
+        
+    Returns:
+        Largest glyph advance at 1pt, or infinity if it cannot be determined
+    """
+    try:
+        font = pdfmetrics.getFont(font_name)
+        
+        # TrueType fonts keep their advances per character code
+        char_widths = getattr(font.face, 'charWidths', None)
+        if char_widths:
+            return max(max(char_widths.values()), font.face.defaultWidth) / 1000
+        
+        # Standard Type 1 fonts have a fixed width table
+        return max(font.widths) / 1000
+    except Exception as e:
+        logger.warning(f"Error getting maximum glyph advance for {font_name}: {str(e)}")
+        return float('inf')
+
+
+@functools.lru_cache(maxsize=4096)
+def get_word_width(word: str, font_name: str, font_size: float) -> float:
+    """
+    Calculate the width of a word using the cached per-font glyph advances.
+    
+    Args:
+        word: Word to measure
+        font_name: Font name
+        font_size: Font size in points
+        
+    Returns:
+        Width of the word in points
+    """
+    return font_size * sum(get_glyph_advances(word, font_name))
\ No newline at end of file
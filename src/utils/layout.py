@@ -0,0 +1,189 @@
+"""
+Layout helpers for breaking measured text into lines and fitting it into boxes.
+"""
+
+import math
+import bisect
+import functools
+import itertools
+from typing import List, Sequence
+
+from src.utils.font_utils import get_word_width, get_glyph_advances, get_max_glyph_advance
+
+
+def wrap_indices(word_widths: Sequence[float], space_width: float, max_width: float) -> List[int]:
+    """
+    Compute greedy line breaks for a sequence of measured words.
+    
+    The kernel only works on plain numbers so callers measure each word once
+    and slice their own word lists with the returned indices.
+    
+    Args:
+        word_widths: Width of each word in points
+        space_width: Width of the space between words in points
+        max_width: Maximum line width in points
+        
+    Returns:
+        Indices of the words that start a new line (the first line is implied)
+    """
+    breaks = []
+    current_width = 0.0
+    line_empty = True
+    
+    for i, word_width in enumerate(word_widths):
+        # A word always goes on an empty line, even if it is too wide
+        if not line_empty and current_width + word_width > max_width:
+            breaks.append(i)
+            current_width = 0.0
+        current_width += word_width + space_width
+        line_empty = False
+    
+    return breaks
+
+
+def break_chars(text: str, max_width: float, font_name: str, font_size: float) -> List[str]:
+    """
+    Break text into lines at character boundaries.
+    
+    Each glyph is measured once and the running widths are summed up front,
+    so every break point is a binary search instead of re-measuring the line.
+    
+    Args:
+        text: Text to break (a single paragraph)
+        max_width: Maximum line width in points
+        font_name: Font name
+        font_size: Font size
+        
+    Returns:
+        List of text lines; a glyph wider than max_width gets a line of its own
+    """
+    # cumulative[i] is the width of text[:i + 1]
+    cumulative = list(itertools.accumulate(
+        advance * font_size for advance in get_glyph_advances(text, font_name)
+    ))
+    
+    lines = []
+    start = 0
+    offset = 0.0
+    while start < len(text):
+        end = bisect.bisect_right(cumulative, offset + max_width, start)
+        # A character always goes on an empty line, even if it is too wide
+        if end == start:
+            end = start + 1
+        lines.append(text[start:end])
+        offset = cumulative[end - 1]
+        start = end
+    
+    return lines
+
+
+def wrap_lines(text: str, max_width: float, font_name: str, font_size: float) -> List[str]:
+    """
+    Wrap text to fit within a maximum width.
+    
+    Args:
+        text: Text to wrap
+        max_width: Maximum width in points
+        font_name: Font name
+        font_size: Font size
+        
+    Returns:
+        List of wrapped text lines
+    """
+    # Handle empty text
+    if not text or text.isspace():
+        return []
+    
+    # Fast path: short single-line text that fits even if every glyph were the widest one
+    if '\n' not in text and font_size * len(text) * get_max_glyph_advance(font_name) <= max_width:
+        return [' '.join(text.split())]
+    
+    # Split text into lines based on newlines
+    paragraphs = text.split('\n')
+    result_lines = []
+    
+    # The space width is the same for every word at this font and size
+    space_width = get_word_width(' ', font_name, font_size)
+    
+    for paragraph in paragraphs:
+        if not paragraph:
+            result_lines.append('')
+            continue
+        
+        # Measure each word once, then let the kernel pick the break points
+        words = paragraph.split()
+        word_widths = [get_word_width(word, font_name, font_size) for word in words]
+        breaks = wrap_indices(word_widths, space_width, max_width)
+        
+        # Slice the words into lines at the break points
+        start = 0
+        for end in breaks + [len(words)]:
+            if end > start:
+                result_lines.append(' '.join(words[start:end]))
+            start = end
+    
+    return result_lines
+
+
+def text_fits(text: str, max_width: float, max_height: float, font_name: str, font_size: float) -> bool:
+    """
+    Check whether wrapped text fits within the given height.
+    
+    Args:
+        text: Text to render
+        max_width: Maximum width
+        max_height: Maximum height
+        font_name: Font name
+        font_size: Font size
+        
+    Returns:
+        True if the wrapped lines fit, False otherwise
+    """
+    lines = wrap_lines(text, max_width, font_name, font_size)
+    return len(lines) * font_size * 1.2 <= max_height
+
+
+@functools.lru_cache(maxsize=8192)
+def find_optimal_font_size(text: str, max_width: float, max_height: float, 
+                           font_name: str, starting_font_size: float) -> float:
+    """
+    Find the optimal font size to fit text within given dimensions.
+    
+    Results are cached, so repeated elements such as headers and footers are
+    only sized once per document.
+    
+    Args:
+        text: Text to render
+        max_width: Maximum width
+        max_height: Maximum height
+        font_name: Font name
+        starting_font_size: Initial font size
+        
+    Returns:
+        Optimal font size
+    """
+    min_font_size = 6.0  # Minimum readable font size
+    
+    # Estimate the size at which the text area (width x line height) fills the box:
+    # total_width_at_1pt * size * (size * 1.2) = max_width * max_height
+    total_width_at_1pt = sum(get_glyph_advances(text, font_name))
+    if total_width_at_1pt > 0:
+        estimated_size = math.sqrt((max_width * max_height) / (1.2 * total_width_at_1pt))
+    else:
+        estimated_size = starting_font_size
+    font_size = max(min_font_size, min(estimated_size, starting_font_size))
+    
+    if text_fits(text, max_width, max_height, font_name, font_size):
+        return font_size
+    
+    # Wrapping wastes some space, so bisect down from the estimate
+    low, high = min_font_size, font_size
+    for _ in range(5):
+        mid = (low + high) / 2
+        if text_fits(text, max_width, max_height, font_name, mid):
+            low = mid
+        else:
+            high = mid
+    
+    # Falls back to the minimum font size if we couldn't find a better fit
+    return low
\ No newline at end of file
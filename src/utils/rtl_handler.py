@@ -4,15 +4,81 @@ Utilities for handling Right-to-Left (RTL) text, particularly Persian.
 
 import re
 import logging
+import unicodedata
+import functools
 from typing import Optional, List
 import arabic_reshaper
-from bidi.algorithm import get_display
-from langdetect import detect, LangDetectException
+try:
+    # python-bidi >= 0.5 ships a compiled implementation at the package root
+    from bidi import get_display
+except ImportError:
+    from bidi.algorithm import get_display
 
 logger = logging.getLogger(__name__)
 
-# Regex pattern for Persian characters
-PERSIAN_PATTERN = re.compile(r'[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF\uFB50-\uFDFF\uFE70-\uFEFF]+')
+# Regex pattern for a Persian character; a single-character class lets search()
+# stop at the first hit instead of consuming the whole run of Persian text
+PERSIAN_PATTERN = re.compile(r'[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF\uFB50-\uFDFF\uFE70-\uFEFF]')
+
+# Patterns used by clean_text_for_translation
+_CONTROL_CHARS_RE = re.compile(r'[\x00-\x08\x0B-\x0C\x0E-\x1F\x7F]')
+# Only runs of two or more spaces; rewriting every single space is wasted work
+_MULTIPLE_SPACES_RE = re.compile(r' {2,}')
+_EXCESS_NEWLINES_RE = re.compile(r'\n{3,}')
+
+# Strongly right-to-left characters of the Arabic-script ranges, plus the plain space.
+# A line made only of these has every character at the same RTL level, so its
+# BiDi display order is simply the reversed string
+_STRONG_RTL_CHARS = frozenset(
+    [' '] + [
+        chr(cp)
+        for start, end in ((0x0600, 0x0700), (0x0750, 0x0780), (0x08A0, 0x0900),
+                           (0xFB50, 0xFE00), (0xFE70, 0xFF00))
+        for cp in range(start, end)
+        if unicodedata.bidirectional(chr(cp)) in ('R', 'AL')
+    ]
+)
+
+# Longer texts are shaped directly so the cache only holds short, recurring lines
+MAX_CACHED_SHAPE_LENGTH = 2048
+
+
+def visual_order(text: str) -> str:
+    """
+    Apply the BiDi algorithm to reshaped text.
+    
+    Args:
+        text: Reshaped text in logical order
+        
+    Returns:
+        Text in visual order
+    """
+    if _STRONG_RTL_CHARS.issuperset(text):
+        return text[::-1]
+    return get_display(text)
+
+
+@functools.lru_cache(maxsize=16384)
+def _shape_cached(text: str) -> str:
+    return visual_order(arabic_reshaper.reshape(text))
+
+
+def shape_text(text: str) -> str:
+    """
+    Apply Arabic reshaping and the BiDi algorithm to text.
+    Results for texts up to MAX_CACHED_SHAPE_LENGTH characters are cached.
+    
+    Args:
+        text: Text in logical order
+        
+    Returns:
+        Reshaped text in visual order
+    """
+    if len(text) <= MAX_CACHED_SHAPE_LENGTH:
+        return _shape_cached(text)
+        
+    # Apply Arabic reshaping (connects letters properly), then the BiDi algorithm
+    return visual_order(arabic_reshaper.reshape(text))
 
 
 class RTLHandler:
@@ -34,27 +100,16 @@ class RTLHandler:
         if not text or not isinstance(text, str):
             return False
             
-        # First check using regex for Persian characters
-        if PERSIAN_PATTERN.search(text):
-            return True
-            
-        # If no Persian characters found but text is long enough,
-        # try language detection
-        if len(text) > 20:
-            try:
-                lang = detect(text)
-                return lang == 'fa'
-            except LangDetectException:
-                # If language detection fails, rely on regex result
-                pass
-                
-        return False
+        # Persian is only written in the Arabic-script ranges, so text without
+        # them cannot be Persian; pure ASCII text (a single C-level scan) has none
+        return not text.isascii() and PERSIAN_PATTERN.search(text) is not None
     
     @staticmethod
     def prepare_persian_text(text: str) -> str:
         """
         Prepare Persian text for rendering in PDFs.
         Applies Arabic reshaping and BiDi algorithm.
+        Results for short texts are cached since the same lines recur across font size retries.
         
         Args:
             text: Persian text to prepare
@@ -65,14 +120,12 @@ class RTLHandler:
         if not text:
             return ""
             
-        try:
-            # Apply Arabic reshaping (connects letters properly)
-            reshaped_text = arabic_reshaper.reshape(text)
-            
-            # Apply BiDi algorithm to handle right-to-left text
-            prepared_text = get_display(reshaped_text)
+        # Pure ASCII text has nothing to reshape and no right-to-left runs to reorder
+        if text.isascii():
+            return text
             
-            return prepared_text
+        try:
+            return shape_text(text)
         except Exception as e:
             logger.error(f"Error preparing Persian text: {str(e)}")
             return text  # Return original text if processing fails
@@ -92,13 +145,13 @@ class RTLHandler:
             return ""
             
         # Remove control characters except newlines and tabs
-        cleaned = re.sub(r'[\x00-\x08\x0B-\x0C\x0E-\x1F\x7F]', '', text)
+        cleaned = _CONTROL_CHARS_RE.sub('', text)
         
         # Replace multiple spaces with single space
-        cleaned = re.sub(r' +', ' ', cleaned)
+        cleaned = _MULTIPLE_SPACES_RE.sub(' ', cleaned)
         
         # Replace multiple newlines with at most two
-        cleaned = re.sub(r'\n{3,}', '\n\n', cleaned)
+        cleaned = _EXCESS_NEWLINES_RE.sub('\n\n', cleaned)
         
         # Trim whitespace
         cleaned = cleaned.strip()
@@ -106,26 +159,31 @@ class RTLHandler:
         return cleaned
     
     @staticmethod
-    def get_text_direction(text: str) -> str:
+    def get_text_direction(text: str, is_rtl: Optional[bool] = None) -> str:
         """
         Determine the text direction (RTL or LTR).
         
         Args:
             text: Text to analyze
+            is_rtl: Already known direction (e.g. TextElement.is_rtl), or None to detect it
             
         Returns:
             'rtl' for right-to-left text, 'ltr' otherwise
         """
-        return 'rtl' if RTLHandler.is_persian(text) else 'ltr'
+        if is_rtl is None:
+            is_rtl = RTLHandler.is_persian(text)
+        return 'rtl' if is_rtl else 'ltr'
     
     @staticmethod
-    def get_alignment_for_text(text: str, default_alignment: Optional[str] = None) -> str:
+    def get_alignment_for_text(text: str, default_alignment: Optional[str] = None,
+                               is_rtl: Optional[bool] = None) -> str:
         """
         Get the appropriate text alignment based on text direction.
         
         Args:
             text: Text to analyze
             default_alignment: Default alignment to use if not determined by text
+            is_rtl: Already known direction (e.g. TextElement.is_rtl), or None to detect it
             
         Returns:
             'right' for RTL text, 'left' for LTR text, or the default_alignment
@@ -133,7 +191,9 @@ class RTLHandler:
         if default_alignment:
             return default_alignment
             
-        return 'right' if RTLHandler.is_persian(text) else 'left'
+        if is_rtl is None:
+            is_rtl = RTLHandler.is_persian(text)
+        return 'right' if is_rtl else 'left'
 
     @staticmethod
     def split_rtl_lines(text: str, max_width: float, font_name: str, font_size: float) -> List[str]:
@@ -149,7 +209,7 @@ class RTLHandler:
         Returns:
             List of text lines
         """
-        from src.utils.font_utils import FontUtils
+        from src.utils.layout import break_chars
         
         # If text is empty, return empty list
         if not text or text.isspace():
@@ -165,26 +225,6 @@ class RTLHandler:
                 continue
                 
             # For RTL text, we need character-by-character processing
-            current_line = ''
-            current_width = 0
-            
-            # Process each character
-            chars = list(paragraph)
-            for char in chars:
-                # Calculate width of character
-                char_width = FontUtils.get_text_width(char, font_name, font_size)
-                
-                # If adding this character would exceed max width, start new line
-                if current_width + char_width > max_width and current_line:
-                    lines.append(current_line)
-                    current_line = char
-                    current_width = char_width
-                else:
-                    current_line += char
-                    current_width += char_width
-                    
-            # Add the last line
-            if current_line:
-                lines.append(current_line)
+            lines.extend(break_chars(paragraph, max_width, font_name, font_size))
                 
         return lines 
\ No newline at end of file
@@ -3,19 +3,29 @@ Utility functions for text processing and RTL text handling.
 """
 import re
 import logging
-import arabic_reshaper
-from bidi.algorithm import get_display
-from langdetect import detect
+from typing import Optional
+
+from src.utils.rtl_handler import shape_text
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, 
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Regex pattern for Persian characters
+PERSIAN_CHAR_PATTERN = re.compile(r'[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF\uFB50-\uFDFF\uFE70-\uFEFF]')
+
+# Patterns used by clean_text_for_translation
+_WHITESPACE_RE = re.compile(r'\s+')
+_CONTROL_CHARS_RE = re.compile(r'[\x00-\x1F\x7F-\x9F]')
+# Zero-width non-joiner, which separates the parts of Persian words
+_ZWNJ = '\u200c'
+
 def prepare_persian_text(text: str) -> str:
     """
     Prepare Persian text for rendering in PDF.
     Applies Arabic reshaping and BiDi algorithm for proper RTL display.
+    Results for short texts are cached since the same lines recur across font size retries.
     
     Args:
         text: Text to prepare
@@ -27,13 +37,13 @@ def prepare_persian_text(text: str) -> str:
     if not text or text.isspace():
         return ""
         
-    # Reshape Arabic/Persian characters
-    reshaped_text = arabic_reshaper.reshape(text)
-    
-    # Apply bidirectional algorithm
-    bidi_text = get_display(reshaped_text)
-    
-    return bidi_text
+    # Pure ASCII text has nothing to reshape and no right-to-left runs to reorder
+    if text.isascii():
+        return text
+        
+    # Reshape Arabic/Persian characters and apply the bidirectional algorithm,
+    # sharing RTLHandler's cache of shaped lines
+    return shape_text(text)
 
 def is_persian(text: str) -> bool:
     """
@@ -49,14 +59,8 @@ def is_persian(text: str) -> bool:
         if not text or text.isspace():
             return False
             
-        # Check for Persian characters
-        persian_pattern = re.compile(r'[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF\uFB50-\uFDFF\uFE70-\uFEFF]')
-        if persian_pattern.search(text):
-            return True
-            
-        # Use language detection as fallback
-        lang = detect(text)
-        return lang == 'fa'
+        # Check for Persian characters; pure ASCII text cannot contain any
+        return not text.isascii() and PERSIAN_CHAR_PATTERN.search(text) is not None
     except:
         return False
 
@@ -71,14 +75,44 @@ def clean_text_for_translation(text: str) -> str:
         Cleaned text
     """
     # Remove excessive whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = _WHITESPACE_RE.sub(' ', text).strip()
     
-    # Remove control characters
-    text = re.sub(r'[\x00-\x1F\x7F-\x9F]', '', text)
+    # Remove control characters; whitespace is already collapsed to spaces,
+    # so text that is entirely printable (a single C-level scan) has none
+    if not text.isprintable():
+        text = _CONTROL_CHARS_RE.sub('', text)
     
     return text
 
-def wrap_text(text: str, max_width: float, font_name: str, font_size: float) -> list:
+def _split_words(words: list, max_width: float, font_name: str, font_size: float) -> list:
+    """
+    Group words into lines, measuring each word once.
+    
+    Args:
+        words: Words to group
+        max_width: Maximum line width in points
+        font_name: Font name
+        font_size: Font size
+        
+    Returns:
+        List of lines, each a list of words
+    """
+    from src.utils.font_utils import get_word_width
+    from src.utils.layout import wrap_indices
+    
+    space_width = get_word_width(' ', font_name, font_size)
+    word_widths = [get_word_width(word, font_name, font_size) for word in words]
+    
+    lines = []
+    start = 0
+    for end in wrap_indices(word_widths, space_width, max_width) + [len(words)]:
+        if end > start:
+            lines.append(words[start:end])
+        start = end
+    return lines
+
+def wrap_text(text: str, max_width: float, font_name: str, font_size: float,
+              is_rtl: Optional[bool] = None) -> list:
     """
     Wrap text to fit within maximum width.
     
@@ -87,11 +121,13 @@ def wrap_text(text: str, max_width: float, font_name: str, font_size: float) ->
         max_width: Maximum width in points
         font_name: Font name
         font_size: Font size
+        is_rtl: Whether the text is Persian, or None to detect it
         
     Returns:
         List of wrapped text lines
     """
-    from src.utils.font_utils import get_text_width
+    from src.utils.font_utils import get_text_width, get_word_width
+    from src.utils.layout import break_chars
     
     # Handle empty text
     if not text or text.isspace():
@@ -102,97 +138,34 @@ def wrap_text(text: str, max_width: float, font_name: str, font_size: float) ->
         return [text]
     
     # For Persian text, we need to handle wrapping differently due to RTL
-    if is_persian(text):
+    if is_rtl is None:
+        is_rtl = is_persian(text)
+    if is_rtl:
         # First try a character-by-character approach for Persian
         # This is more accurate for Persian text which doesn't have clear word boundaries in some cases
-        result = []
-        current_line = ""
-        
-        # Split into characters
-        chars = list(text)
-        
-        for char in chars:
-            test_line = current_line + char
-            if get_text_width(test_line, font_name, font_size) <= max_width:
-                current_line = test_line
-            else:
-                if current_line:
-                    result.append(current_line)
-                    current_line = char
-                else:
-                    # Character itself is too wide (rare case)
-                    result.append(char)
-                    current_line = ""
+        result = break_chars(text, max_width, font_name, font_size)
         
-        # Add the last line
-        if current_line:
-            result.append(current_line)
-        
-        # If we ended up with just one line that's still too wide,
-        # fall back to word-based wrapping
-        if len(result) <= 1 and get_text_width(result[0], font_name, font_size) > max_width:
+        # If we ended up with just one line it is the whole text, which is
+        # already known to be too wide, so fall back to word-based wrapping
+        if len(result) <= 1:
             # Try word-based wrapping as a fallback
             # Split text into words (considering Persian word boundaries)
             # Persian space character (ZWNJ) and standard space
-            words = re.split(r'[\u200c\s]+', text)
-            words = [w for w in words if w]  # Remove empty words
+            words = text.replace(_ZWNJ, ' ').split()
             
+            # Measure each word once and let the kernel pick the break points;
+            # a word too wide for a line of its own is broken between characters
             result = []
-            current_line = ""
-            
-            for word in words:
-                test_line = current_line + (" " if current_line else "") + word
-                if get_text_width(test_line, font_name, font_size) <= max_width:
-                    current_line = test_line
+            for line_words in _split_words(words, max_width, font_name, font_size):
+                if len(line_words) == 1 and get_word_width(line_words[0], font_name, font_size) > max_width:
+                    result.extend(break_chars(line_words[0], max_width, font_name, font_size))
                 else:
-                    if current_line:
-                        result.append(current_line)
-                        current_line = word
-                    else:
-                        # Word itself is too wide, need to split it
-                        chars = list(word)
-                        word_line = ""
-                        for char in chars:
-                            test_word_line = word_line + char
-                            if get_text_width(test_word_line, font_name, font_size) <= max_width:
-                                word_line = test_word_line
-                            else:
-                                if word_line:
-                                    result.append(word_line)
-                                    word_line = char
-                                else:
-                                    # Character is too wide (rare case)
-                                    result.append(char)
-                                    word_line = ""
-                        
-                        if word_line:
-                            result.append(word_line)
-                        current_line = ""
-            
-            # Add the last line
-            if current_line:
-                result.append(current_line)
+                    result.append(" ".join(line_words))
     else:
-        # For non-Persian text, use standard word-based wrapping
+        # For non-Persian text, use standard word-based wrapping;
+        # a word too wide for any line is kept whole
         words = text.split()
-        result = []
-        current_line = ""
-        
-        for word in words:
-            test_line = current_line + (" " if current_line else "") + word
-            if get_text_width(test_line, font_name, font_size) <= max_width:
-                current_line = test_line
-            else:
-                if current_line:
-                    result.append(current_line)
-                    current_line = word
-                else:
-                    # Word itself is too wide, need to split it
-                    result.append(word)  # For non-Persian, just add the word even if too wide
-                    current_line = ""
-        
-        # Add the last line
-        if current_line:
-            result.append(current_line)
+        result = [" ".join(line_words)
+                  for line_words in _split_words(words, max_width, font_name, font_size)]
         
     return result 
\ No newline at end of file
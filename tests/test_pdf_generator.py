@@ -0,0 +1,70 @@
+"""
+Tests for PDFGenerator.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import fitz  # PyMuPDF
+
+from src.models.text_element import TextElement
+from src.generator.pdf_generator import PDFGenerator
+
+
+def make_elements(page_count: int):
+    elements = []
+    for page_num in range(page_count):
+        element = TextElement(f"Text on page {page_num}", page_num, 50, 50, 300, 80, font_size=12)
+        element.set_translated_text(f"Translated page {page_num}")
+        elements.append(element)
+    return elements
+
+
+class TestGenerateTextPdf(unittest.TestCase):
+    
+    def setUp(self):
+        # PDFGenerator creates its temp directory in the working directory
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        cwd = os.getcwd()
+        os.chdir(self.temp_dir)
+        self.addCleanup(os.chdir, cwd)
+    
+    def render(self, generator: PDFGenerator, page_count: int) -> int:
+        doc_info = {
+            "page_count": page_count,
+            "widths": [595.0] * page_count,
+            "heights": [842.0] * page_count,
+            "rotations": [0] * page_count
+        }
+        pdf_bytes = generator._generate_text_pdf(make_elements(page_count), doc_info)
+        with fitz.open("pdf", pdf_bytes) as doc:
+            return len(doc)
+    
+    def test_serial_and_parallel_output_have_the_same_page_count(self):
+        serial = PDFGenerator(parallel_min_pages=1000)
+        parallel = PDFGenerator(parallel_min_pages=2)
+        
+        with mock.patch('src.generator.pdf_generator.os.cpu_count', return_value=2), \
+             mock.patch.object(parallel, '_generate_text_pdf_parallel',
+                               wraps=parallel._generate_text_pdf_parallel) as parallel_path:
+            parallel_pages = self.render(parallel, 3)
+            parallel_path.assert_called_once()
+        
+        self.assertEqual(self.render(serial, 3), 3)
+        self.assertEqual(parallel_pages, 3)
+    
+    def test_small_documents_render_serially(self):
+        generator = PDFGenerator(parallel_min_pages=8)
+        
+        with mock.patch('src.generator.pdf_generator.os.cpu_count', return_value=8), \
+             mock.patch.object(generator, '_generate_text_pdf_parallel') as parallel_path:
+            self.assertEqual(self.render(generator, 2), 2)
+            parallel_path.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
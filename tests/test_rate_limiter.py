@@ -0,0 +1,99 @@
+"""
+Tests for RateLimiter.
+"""
+
+import time
+import threading
+import unittest
+from unittest import mock
+
+from src.translator.rate_limiter import RateLimiter
+
+
+class FakeClock:
+    """Monotonic clock whose sleep advances time instead of blocking."""
+    
+    def __init__(self):
+        self.now = 1000.0
+        self._lock = threading.Lock()
+    
+    def monotonic(self) -> float:
+        with self._lock:
+            return self.now
+    
+    def sleep(self, seconds: float) -> None:
+        with self._lock:
+            self.now += seconds
+
+
+class TestRateLimiter(unittest.TestCase):
+    
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch('src.translator.rate_limiter.time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def test_concurrent_callers_respect_requests_per_minute(self):
+        limiter = RateLimiter(requests_per_minute=5, max_retries=1, base_delay=1)
+        reservations = []
+        reservations_lock = threading.Lock()
+        start = threading.Barrier(20)
+        
+        def worker():
+            start.wait()
+            for _ in range(3):
+                timestamp = limiter.wait_if_needed()
+                # Hold the slot like a real request would, giving the other
+                # workers a chance to run between check and request
+                time.sleep(0.001)
+                with reservations_lock:
+                    reservations.append(timestamp)
+        
+        threads = [threading.Thread(target=worker) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        reservations.sort()
+        self.assertEqual(len(reservations), 60)
+        # No 60 second window may hold more requests than the limit allows
+        for i, timestamp in enumerate(reservations):
+            in_window = [t for t in reservations[i:] if t - timestamp < 60]
+            self.assertLessEqual(len(in_window), limiter.requests_per_minute)
+    
+    def test_waiting_caller_does_not_hold_the_lock(self):
+        limiter = RateLimiter(requests_per_minute=2, max_retries=1, base_delay=1)
+        limiter.wait_if_needed()
+        
+        sleeping = threading.Event()
+        release = threading.Event()
+        
+        def blocking_sleep(seconds):
+            sleeping.set()
+            release.wait(5)
+            self.clock.now += seconds
+        
+        self.clock.sleep = blocking_sleep
+        waiter = threading.Thread(target=limiter.wait_if_needed)
+        waiter.start()
+        self.assertTrue(sleeping.wait(5))
+        
+        # The lock must be free while the waiter sleeps
+        self.assertTrue(limiter._lock.acquire(timeout=1))
+        limiter._lock.release()
+        
+        release.set()
+        waiter.join(5)
+        self.assertFalse(waiter.is_alive())
+    
+    def test_release_request_frees_the_slot(self):
+        limiter = RateLimiter(requests_per_minute=5, max_retries=1, base_delay=1)
+        timestamp = limiter.wait_if_needed()
+        limiter.release_request(timestamp)
+        self.assertEqual(len(limiter.request_timestamps), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
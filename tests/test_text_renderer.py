@@ -0,0 +1,45 @@
+"""
+Tests for TextRenderer.
+"""
+
+import unittest
+from unittest import mock
+
+from src.models.text_element import TextElement
+from src.generator.text_renderer import TextRenderer
+
+
+def make_element(text: str, translated_text: str) -> TextElement:
+    element = TextElement(text, 0, 50, 50, 300, 80, font_size=12)
+    element.set_translated_text(translated_text)
+    return element
+
+
+class TestAddTextToCanvas(unittest.TestCase):
+    
+    def setUp(self):
+        self.renderer = TextRenderer()
+        self.canvas = mock.MagicMock()
+    
+    def test_failed_translation_is_not_drawn(self):
+        element = make_element("Hello", "[Translation error: quota exceeded]")
+        element.is_complete = False
+        
+        self.renderer.add_text_to_canvas(self.canvas, [element], 800)
+        
+        self.canvas.drawString.assert_not_called()
+        self.canvas.drawRightString.assert_not_called()
+        self.canvas.drawCentredString.assert_not_called()
+    
+    def test_completed_translation_is_drawn(self):
+        element = make_element("Hello", "Bonjour")
+        
+        self.renderer.add_text_to_canvas(self.canvas, [element], 800)
+        
+        drawn = (self.canvas.drawString.call_count + self.canvas.drawRightString.call_count
+                 + self.canvas.drawCentredString.call_count)
+        self.assertGreater(drawn, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+Tests for TranslationCache.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from src.translator.translation_cache import TranslationCache
+
+
+class TestTranslationCache(unittest.TestCase):
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.path = os.path.join(self.temp_dir, 'cache', 'translations.db')
+        self.cache = TranslationCache(self.path)
+        self.addCleanup(lambda: self.cache.close())
+    
+    def put(self, text: str, value: str) -> None:
+        self.cache.put(TranslationCache.make_key('general', 'model', text), value,
+                       TranslationCache.make_near_key('general', 'model', text))
+    
+    def get_near(self, text: str):
+        return self.cache.get_near(TranslationCache.make_near_key('general', 'model', text))
+    
+    def test_exact_hit(self):
+        self.put("Hello world", "سلام دنیا")
+        key = TranslationCache.make_key('general', 'model', "Hello world")
+        self.assertEqual(self.cache.get(key), "سلام دنیا")
+    
+    def test_exact_miss_for_other_domain_or_model(self):
+        self.put("Hello world", "سلام دنیا")
+        self.assertIsNone(self.cache.get(TranslationCache.make_key('medical', 'model', "Hello world")))
+        self.assertIsNone(self.cache.get(TranslationCache.make_key('general', 'other', "Hello world")))
+    
+    def test_near_hit_for_spacing_and_hyphenation(self):
+        self.put("The translation of text.", "ترجمه متن")
+        self.assertEqual(self.get_near("The  trans- lation of\ntext."), "ترجمه متن")
+        self.assertEqual(self.get_near(" The translation\tof text. "), "ترجمه متن")
+    
+    def test_near_lookup_keeps_punctuation(self):
+        self.put("Done?", "تمام شد؟")
+        self.put("(1)", "(۱)")
+        self.assertIsNone(self.get_near("Done."))
+        self.assertIsNone(self.get_near("Done"))
+        self.assertIsNone(self.get_near("[1]"))
+        self.assertIsNone(self.get_near("1"))
+        
+        self.put("Done.", "تمام شد.")
+        self.assertEqual(self.get_near("Done?"), "تمام شد؟")
+        self.assertEqual(self.get_near("Done."), "تمام شد.")
+    
+    def test_near_keys_from_an_older_normalize_are_dropped(self):
+        self.put("Done?", "تمام شد؟")
+        self.cache._conn.execute("PRAGMA user_version = 0")
+        self.cache._conn.commit()
+        self.cache.close()
+        
+        self.cache = TranslationCache(self.path)
+        self.assertIsNone(self.get_near("Done?"))
+        self.assertEqual(self.cache.get(TranslationCache.make_key('general', 'model', "Done?")), "تمام شد؟")
+    
+    def test_near_lookup_is_case_sensitive(self):
+        self.put("US", "ایالات متحده")
+        self.put("Polish", "لهستانی")
+        self.assertIsNone(self.get_near("us"))
+        self.assertIsNone(self.get_near("polish"))
+    
+    def test_entries_persist_across_instances(self):
+        self.put("Hello world", "سلام دنیا")
+        self.cache.close()
+        self.cache = TranslationCache(self.path)
+        key = TranslationCache.make_key('general', 'model', "Hello world")
+        self.assertEqual(self.cache.get(key), "سلام دنیا")
+    
+    def test_expire_drops_old_entries(self):
+        with mock.patch('src.translator.translation_cache.time.time', return_value=1000.0):
+            self.put("Old text", "قدیمی")
+        with mock.patch('src.translator.translation_cache.time.time', return_value=5000.0):
+            self.put("New text", "جدید")
+            removed = self.cache.expire(3600)
+        
+        self.assertEqual(removed, 1)
+        self.assertIsNone(self.cache.get(TranslationCache.make_key('general', 'model', "Old text")))
+        self.assertIsNone(self.get_near("Old text"))
+        self.assertEqual(self.cache.get(TranslationCache.make_key('general', 'model', "New text")), "جدید")
+        self.assertEqual(self.get_near("New text"), "جدید")
+    
+    def test_ttl_on_open_expires_entries(self):
+        with mock.patch('src.translator.translation_cache.time.time', return_value=1000.0):
+            self.put("Old text", "قدیمی")
+        self.cache.close()
+        
+        with mock.patch('src.translator.translation_cache.time.time', return_value=5000.0):
+            self.cache = TranslationCache(self.path, ttl_seconds=3600)
+        self.assertIsNone(self.cache.get(TranslationCache.make_key('general', 'model', "Old text")))
+
+
+if __name__ == '__main__':
+    unittest.main()
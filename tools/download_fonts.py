@@ -6,14 +6,17 @@ import sys
 import requests
 import shutil
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
-def download_file(url, local_path):
+def download_file(url, local_path, session=requests):
     """Download a file from URL to local path."""
     try:
-        with requests.get(url, stream=True) as r:
+        with session.get(url, stream=True) as r:
             r.raise_for_status()
+            # Copy in 1 MB blocks; decode_content undoes any transfer compression
+            r.raw.decode_content = True
             with open(local_path, 'wb') as f:
-                shutil.copyfileobj(r.raw, f)
+                shutil.copyfileobj(r.raw, f, length=1 << 20)
         print(f"Downloaded {url} to {local_path}")
         return True
     except Exception as e:
@@ -43,17 +46,23 @@ def main():
         'Samim-Regular.ttf': 'https://github.com/rastikerdar/samim-font/raw/master/dist/Samim.ttf'
     }
     
-    # Download each font
+    # Skip fonts that are already there
     success_count = 0
+    missing = {}
     for font_name, font_url in font_urls.items():
         font_path = fonts_dir / font_name
         if font_path.exists():
             print(f"Font {font_name} already exists, skipping download")
             success_count += 1
-            continue
-            
-        if download_file(font_url, font_path):
-            success_count += 1
+        else:
+            missing[font_path] = font_url
+    
+    # Download the rest concurrently over one pooled session
+    if missing:
+        with requests.Session() as session:
+            with ThreadPoolExecutor(max_workers=len(missing)) as executor:
+                results = executor.map(lambda item: download_file(item[1], item[0], session), missing.items())
+                success_count += sum(results)
     
     print(f"\nDownloaded {success_count} of {len(font_urls)} fonts")
     
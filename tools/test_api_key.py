@@ -3,7 +3,8 @@ Test Gemini API key validity.
 """
 import os
 import json
-import requests
+import urllib.request
+import urllib.error
 from dotenv import load_dotenv
 
 def test_api_key_direct():
@@ -41,21 +42,32 @@ def test_api_key_direct():
         ]
     }
     
-    # Make the request
+    # Make the request; the standard library is enough for a single call
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(data).encode('utf-8'),
+        headers={"Content-Type": "application/json"},
+        method="POST"
+    )
     try:
-        response = requests.post(url, json=data)
-        
-        # Check response
-        if response.status_code == 200:
-            print("✅ API key is valid!")
-            return True
-        else:
-            print(f"❌ API key is invalid. Status code: {response.status_code}")
-            print(f"Response: {response.text}")
-            return False
+        with urllib.request.urlopen(request) as response:
+            status_code = response.status
+            response_text = response.read().decode('utf-8')
+    except urllib.error.HTTPError as e:
+        status_code = e.code
+        response_text = e.read().decode('utf-8', errors='replace')
     except Exception as e:
         print(f"❌ Error testing API key: {str(e)}")
         return False
+        
+    # Check response
+    if status_code == 200:
+        print("✅ API key is valid!")
+        return True
+    else:
+        print(f"❌ API key is invalid. Status code: {status_code}")
+        print(f"Response: {response_text}")
+        return False
 
 if __name__ == "__main__":
     success = test_api_key_direct()
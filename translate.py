@@ -23,8 +23,14 @@ logging.basicConfig(level=logging.INFO,
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# خواندن متغیرهای محیطی یک بار هنگام بارگذاری ماژول (اطمینان از وجود GEMINI_API_KEY در فایل .env)
+load_dotenv()
+# مدل سبک‌تر، مگر این که مدل دیگری در محیط تنظیم شده باشد
+os.environ.setdefault("MODEL_NAME", "gemini-1.5-flash")
 
-def translate_pdf(input_path, output_path=None, domain="scientific", batch_size=3, use_dummy_translation=False):
+
+def translate_pdf(input_path, output_path=None, domain="scientific", batch_size=3, use_dummy_translation=False,
+                  translator=None, generator=None):
     """
     ترجمه یک فایل PDF از انگلیسی به فارسی.
     
@@ -34,15 +40,14 @@ def translate_pdf(input_path, output_path=None, domain="scientific", batch_size=
         domain: دامنه ترجمه (general، scientific، medical و غیره)
         batch_size: تعداد متن‌ها برای ترجمه در هر بسته
         use_dummy_translation: استفاده از ترجمه ساختگی برای تست
+        translator: مترجم از پیش ساخته شده برای استفاده مجدد (اختیاری)
+        generator: تولیدکننده PDF از پیش ساخته شده برای استفاده مجدد (اختیاری)
     
     Returns:
         مسیر فایل PDF ترجمه شده
     """
     start_time = time.time()
     
-    # پیکربندی
-    config = AppConfig()
-    
     # تولید مسیر خروجی اگر مشخص نشده باشد
     if output_path is None:
         output_path = FileUtils.get_output_path(input_path)
@@ -77,21 +82,19 @@ def translate_pdf(input_path, output_path=None, domain="scientific", batch_size=
             element.set_translated_text(fake_translation)
     else:
         # ترجمه واقعی با استفاده از API
-        logger.info("راه‌اندازی مترجم...")
-        # تنظیم مدل سبک‌تر با تنظیم محیطی
-        os.environ["MODEL_NAME"] = "gemini-1.5-flash"
-        translator = GeminiTranslator(domain=domain)
+        if translator is None:
+            logger.info("راه‌اندازی مترجم...")
+            translator = GeminiTranslator(domain=domain)
         
         # ترجمه متن‌ها
         logger.info(f"ترجمه متن‌ها در بسته‌های {batch_size} تایی...")
         
         # اصلاح برای استفاده از TextElement API فعلی
+        # همه متن‌ها با یکدیگر به مترجم داده می‌شوند تا در درخواست‌های گروهی و هم‌زمان ترجمه شوند
+        elements_to_translate = [e for e in text_elements if e.text and not e.text.isspace()]
         try:
-            for element in text_elements:
-                if element.text and not element.text.isspace():
-                    translated_text = translator.translate_text(element.text)
-                    element.set_translated_text(translated_text)
-                    logger.info(f"ترجمه: '{element.text[:20]}...' -> '{translated_text[:20]}...'")
+            translator.translate_elements(elements_to_translate, batch_size)
+            logger.info(f"تعداد {len(elements_to_translate)} متن ترجمه شد")
         except Exception as e:
             logger.error(f"خطا در ترجمه: {str(e)}")
     
@@ -106,7 +109,8 @@ def translate_pdf(input_path, output_path=None, domain="scientific", batch_size=
     
     # تولید PDF ترجمه شده
     logger.info("تولید PDF ترجمه شده...")
-    generator = PDFGenerator()
+    if generator is None:
+        generator = PDFGenerator()
     success = generator.generate_translated_pdf(input_path, output_path, text_elements)
     
     if success:
@@ -150,6 +154,9 @@ def translate_sample_files():
     for pdf_file in pdf_files:
         logger.info(f" - {pdf_file}")
     
+    # تولیدکننده PDF یک بار ساخته می‌شود و برای همه فایل‌ها استفاده می‌شود
+    generator = PDFGenerator()
+    
     # ترجمه هر فایل 
     for pdf_file in pdf_files:
         # اگر فایل با test_ شروع شود، آن را نادیده بگیر
@@ -164,14 +171,12 @@ def translate_sample_files():
         
         logger.info(f"درحال ترجمه {filename}...")
         # استفاده از پارامتر use_dummy_translation=True برای جلوگیری از rate limit
-        translate_pdf(pdf_file, output_path, domain="scientific", use_dummy_translation=True)
+        translate_pdf(pdf_file, output_path, domain="scientific", use_dummy_translation=True,
+                      generator=generator)
 
 
 def main():
     """اجرای مترجم PDF فارسی."""
-    # خواندن متغیرهای محیطی (اطمینان از وجود GEMINI_API_KEY در فایل .env)
-    load_dotenv()
-    
     # بررسی وجود کلید API
     config = AppConfig()
     if not config.get_api_key():